@@ -0,0 +1 @@
+"""Benchmarks of the SolaX Modbus integration."""
@@ -0,0 +1,145 @@
+"""Compare the struct decoder with the BinaryPayloadDecoder one it replaced.
+
+Decodes the 86 register input block of the DAYTIME image with both and
+reports the time per decode and the speedup as JSON:
+
+    python -m benchmarks.bench_decoder
+"""
+import argparse
+import json
+import timeit
+
+from pymodbus.constants import Endian
+from pymodbus.payload import BinaryPayloadDecoder
+
+from solax_modbus.const import (
+    REG_INPUT,
+    REGISTER_MAPS,
+    REGISTER_RTC,
+    REGISTER_S16,
+    REGISTER_STR,
+    REGISTER_TIME,
+    REGISTER_U16,
+    SolaXModbusBlock,
+)
+from solax_modbus.decoder import SolaXModbusBlockDecoder, register_length
+
+from .images import DAYTIME, build_image
+
+INPUT_BLOCK = SolaXModbusBlock(REG_INPUT, 0x0, 86)
+
+
+def _decode_time(decoder):
+    hours = decoder.decode_16bit_uint()
+    minutes = decoder.decode_16bit_uint()
+    return f"{hours}:{minutes}"
+
+
+def _decode_rtc(decoder):
+    seconds = decoder.decode_16bit_uint()
+    minutes = decoder.decode_16bit_uint()
+    hours = decoder.decode_16bit_uint()
+    days = decoder.decode_16bit_uint()
+    months = decoder.decode_16bit_uint()
+    years = decoder.decode_16bit_uint()
+    return f"{hours}:{minutes}:{seconds} {days}/{months}/{years}"
+
+
+def _string_reader(length):
+    def _decode_string(decoder):
+        return str(decoder.decode_string(length * 2).decode("ascii"))
+
+    return _decode_string
+
+
+READERS = {
+    REGISTER_U16: BinaryPayloadDecoder.decode_16bit_uint,
+    REGISTER_S16: BinaryPayloadDecoder.decode_16bit_int,
+    REGISTER_TIME: _decode_time,
+    REGISTER_RTC: _decode_rtc,
+}
+
+
+class PayloadBlockDecoder:
+    """The BinaryPayloadDecoder based block decoder, kept as the reference."""
+
+    def __init__(self, block, register_map, gen2=False):
+        self.block = block
+        self._plan = []
+
+        position = block.address
+        end = block.address + block.count
+        for register in sorted(register_map, key=lambda register: register.address):
+            length = register_length(register)
+            if register.address < block.address or register.address + length > end:
+                continue
+            if register.unit == REGISTER_STR:
+                reader = _string_reader(length)
+            else:
+                reader = READERS[register.unit]
+            scale = register.scale
+            if gen2 and register.scale_gen2 is not None:
+                scale = register.scale_gen2
+            self._plan.append(
+                (
+                    (register.address - position) * 2,
+                    reader,
+                    register.key,
+                    scale,
+                    register.precision,
+                    register.options,
+                )
+            )
+            position = register.address + length
+
+    def decode(self, registers):
+        decoder = BinaryPayloadDecoder.fromRegisters(registers, byteorder=Endian.Big)
+
+        data = {}
+        for skip, reader, key, scale, precision, options in self._plan:
+            if skip:
+                decoder.skip_bytes(skip)
+            value = reader(decoder)
+            if options is not None:
+                value = options.get(value, "Unknown")
+            elif scale != 1:
+                value = round(value * scale, precision)
+            data[key] = value
+
+        return data
+
+
+def main():
+    """Time both decoders on the input block and print JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    registers = build_image(REG_INPUT, DAYTIME[REG_INPUT])[: INPUT_BLOCK.count]
+    decoders = {
+        "payload": PayloadBlockDecoder(INPUT_BLOCK, REGISTER_MAPS[REG_INPUT]),
+        "struct": SolaXModbusBlockDecoder(INPUT_BLOCK, REGISTER_MAPS[REG_INPUT]),
+    }
+    if decoders["payload"].decode(registers) != decoders["struct"].decode(registers):
+        raise SystemExit("The decoders disagree")
+
+    results = {
+        name: timeit.timeit(lambda: decoder.decode(registers), number=args.number)
+        / args.number
+        * 1e6
+        for name, decoder in decoders.items()
+    }
+    print(
+        json.dumps(
+            {
+                "block": f"{INPUT_BLOCK.register_type} {INPUT_BLOCK.address:#x}+{INPUT_BLOCK.count}",
+                "decode_us": results,
+                "speedup": results["payload"] / results["struct"],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Benchmark the SolaX Modbus hub against a local Modbus TCP stand-in.
+
+Starts a pymodbus server loaded with the DAYTIME register image and
+measures, on the real hub, connection and entities:
+
+* polls per second, realtime only and with every tier, serial and pipelined
+* the same over a slow link, from a second stand-in that answers every
+  request --latency milliseconds after it arrived
+* decode time of every planned block
+* update and dispatch time of a full poll with a listener on every key
+* write latency through the number and select entities
+* event loop lag while polling, on both links
+
+Run from the repository root with Home Assistant and pymodbus installed:
+
+    python -m benchmarks.bench_hub --output results.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import queue
+import socket
+import statistics
+import tempfile
+import threading
+import time
+import timeit
+from pathlib import Path
+
+import pymodbus
+from homeassistant.core import HomeAssistant
+from pymodbus.datastore import (
+    ModbusSequentialDataBlock,
+    ModbusServerContext,
+    ModbusSlaveContext,
+)
+from pymodbus.server.sync import ModbusConnectedRequestHandler, ModbusTcpServer
+
+from solax_modbus import SolaXModbusHub
+from solax_modbus.const import NUMBER_TYPES_G3, REG_HOLDING, REG_INPUT, SELECT_TYPES
+from solax_modbus.number import SolaXModbusNumber
+from solax_modbus.select import SolaXModbusSelect
+
+from .images import DAYTIME, build_image
+
+MANIFEST = Path(__file__).parent.parent / "solax_modbus" / "manifest.json"
+
+
+class _WriteRecordingBlock(ModbusSequentialDataBlock):
+    """Holding registers that signal every write."""
+
+    def __init__(self, address, values):
+        super().__init__(address, values)
+        self.written = threading.Event()
+
+    def setValues(self, address, values):
+        super().setValues(address, values)
+        self.written.set()
+
+
+class _NoDelayTcpServer(ModbusTcpServer):
+    """Stand-in that sends every response at once, like a dongle would.
+
+    With Nagle's algorithm on, back to back responses to pipelined requests
+    wait for the delayed ACK of the client and the benchmark would measure
+    that instead of the integration.
+    """
+
+    def get_request(self):
+        request, address = super().get_request()
+        request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return request, address
+
+
+class _LatencyRequestHandler(ModbusConnectedRequestHandler):
+    """Send every response server.latency seconds after its request arrived.
+
+    The responses wait on a thread of their own, so requests sent back to
+    back overlap their delays like on a network with that round trip.
+    """
+
+    def setup(self):
+        super().setup()
+        self._outbox = queue.Queue()
+        threading.Thread(target=self._send_delayed, daemon=True).start()
+
+    def finish(self):
+        self._outbox.put((0, None))
+        super().finish()
+
+    def send(self, message):
+        self._outbox.put((time.monotonic() + self.server.latency, message))
+
+    def _send_delayed(self):
+        while True:
+            due, message = self._outbox.get()
+            if message is None:
+                return
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                ModbusConnectedRequestHandler.send(self, message)
+            except OSError:
+                return
+
+
+def start_server(port, image=DAYTIME, latency=0):
+    """Serve image on 127.0.0.1:port from a thread; return the server and holding block.
+
+    With latency, every response is sent that many seconds after its request.
+    """
+    holding = _WriteRecordingBlock(0, build_image(REG_HOLDING, image[REG_HOLDING]))
+    store = ModbusSlaveContext(
+        hr=holding,
+        ir=ModbusSequentialDataBlock(0, build_image(REG_INPUT, image[REG_INPUT])),
+        zero_mode=True,
+    )
+    server = _NoDelayTcpServer(
+        ModbusServerContext(slaves=store, single=True),
+        address=("127.0.0.1", port),
+        handler=_LatencyRequestHandler if latency else None,
+    )
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, holding
+
+
+def _create_hass(config_dir):
+    """Return a Home Assistant core instance that is not started."""
+    try:
+        return HomeAssistant(config_dir)
+    except TypeError:
+        # Releases before 2022.x take no config dir.
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+        return hass
+
+
+class LoopLagMonitor:
+    """Measure how late a 1 ms timer fires, i.e. how long the loop is blocked."""
+
+    def __init__(self):
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            self.samples.append(time.perf_counter() - started - 0.001)
+
+    def __enter__(self):
+        self.samples = []
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc_info):
+        self._task.cancel()
+
+    def summary(self):
+        """Return the lag statistics in milliseconds."""
+        if not self.samples:
+            return {}
+        samples = sorted(self.samples)
+        return {
+            "lag_ms_mean": statistics.mean(samples) * 1000,
+            "lag_ms_p99": samples[int(len(samples) * 0.99)] * 1000,
+            "lag_ms_max": samples[-1] * 1000,
+        }
+
+
+async def bench_polls(hub, polls, all_tiers):
+    """Poll back to back; return polls per second and the loop lag."""
+    with LoopLagMonitor() as monitor:
+        started = time.perf_counter()
+        for _ in range(polls):
+            if all_tiers:
+                hub._identity_read = False
+                hub._config_read_at = None
+            if not await hub.async_read_modbus_data():
+                raise RuntimeError("poll failed")
+        elapsed = time.perf_counter() - started
+    return {"polls_per_second": polls / elapsed, **monitor.summary()}
+
+
+async def bench_link(hub, polls):
+    """Return the poll rate and loop lag of hub, serial and pipelined."""
+    results = {
+        "poll_realtime": await bench_polls(hub, polls, False),
+        "poll_all_tiers": await bench_polls(hub, polls, True),
+    }
+    hub._pipelined = True
+    results["poll_realtime_pipelined"] = await bench_polls(hub, polls, False)
+    results["poll_all_tiers_pipelined"] = await bench_polls(hub, polls, True)
+    hub._pipelined = False
+    return results
+
+
+async def bench_decode(hub, number):
+    """Return the decode time of every planned block in microseconds."""
+    results = {}
+    responses = await hub.async_read_blocks(hub._block_decoders)
+    for block_decoder, response in zip(hub._block_decoders, responses):
+        block = block_decoder.block
+        seconds = timeit.timeit(
+            lambda: block_decoder.decode(response.registers), number=number
+        )
+        results[f"{block.register_type} {block.address:#x}+{block.count}"] = (
+            seconds / number * 1e6
+        )
+    return results
+
+
+async def bench_dispatch(hub, cycles):
+    """Return the update and dispatch time of one full poll in microseconds."""
+    responses = await hub.async_read_blocks(hub._block_decoders)
+    polled = {}
+    for block_decoder, response in zip(hub._block_decoders, responses):
+        polled.update(block_decoder.decode(response.registers))
+    # A second snapshot where every numeric value moved, so each cycle
+    # dispatches to every listener.
+    moved = {
+        key: value + 100 if isinstance(value, (int, float)) else value
+        for key, value in polled.items()
+    }
+
+    calls = []
+    for key in polled:
+        hub._listeners.setdefault(key, set()).add(lambda: calls.append(None))
+
+    started = time.perf_counter()
+    for cycle in range(cycles):
+        values = moved if cycle % 2 else polled
+        hub._update_data(values)
+        hub._update_derived_data(values)
+        hub._async_dispatch_changes()
+    elapsed = time.perf_counter() - started
+    hub._listeners.clear()
+    return {
+        "cycle_us": elapsed / cycles * 1e6,
+        "callbacks_per_cycle": len(calls) / cycles,
+    }
+
+
+async def bench_writes(hass, hub, holding, writes):
+    """Return the write latency through the number and select entities in ms."""
+    device_info = {}
+    number_info = NUMBER_TYPES_G3[0]
+    number = SolaXModbusNumber("Bench", hub, device_info, *number_info, None)
+    select = SolaXModbusSelect("Bench", hub, device_info, *SELECT_TYPES[0])
+    for domain, entity in (("number", number), ("select", select)):
+        entity.hass = hass
+        entity.entity_id = f"{domain}.bench_{entity._key}"
+
+    async def _write(set_value, flush):
+        holding.written.clear()
+        started = time.perf_counter()
+        await set_value()
+        if flush:
+            await hub.async_flush_writes()
+        await hass.async_add_executor_job(holding.written.wait, 10)
+        return (time.perf_counter() - started) * 1000
+
+    results = {}
+    for name, set_value in (
+        ("number", lambda: number.async_set_value(10.5)),
+        ("select", lambda: select.async_select_option("Feedin Priority")),
+    ):
+        flushed = [await _write(set_value, True) for _ in range(writes)]
+        debounced = [await _write(set_value, False) for _ in range(min(writes, 5))]
+        results[name] = {
+            "flush_ms_mean": statistics.mean(flushed),
+            "flush_ms_max": max(flushed),
+            "debounced_ms_mean": statistics.mean(debounced),
+        }
+    return results
+
+
+async def run(args):
+    """Run every benchmark and return the results."""
+    server, holding = start_server(args.port)
+    slow_server, _ = start_server(args.port + 1, latency=args.latency / 1000)
+    try:
+        hass = _create_hass(tempfile.mkdtemp())
+        hub = SolaXModbusHub(
+            hass, "Bench", "127.0.0.1", args.port, 2, read_gen3x1=True
+        )
+        slow_hub = SolaXModbusHub(
+            hass, "BenchSlow", "127.0.0.1", args.port + 1, 2, read_gen3x1=True
+        )
+        for bench_hub in (hub, slow_hub):
+            if not await bench_hub.async_read_modbus_data():
+                raise RuntimeError(f"cannot poll the stand-in of {bench_hub.name}")
+
+        results = {
+            "blocks": [
+                f"{decoder.block.register_type} {decoder.block.address:#x}+{decoder.block.count}"
+                for decoder in hub._block_decoders
+            ],
+            **await bench_link(hub, args.polls),
+            "slow_link": {
+                "latency_ms": args.latency,
+                **await bench_link(slow_hub, args.slow_polls),
+            },
+        }
+        results["decode_us"] = await bench_decode(hub, args.decodes)
+        results["dispatch"] = await bench_dispatch(hub, args.decodes)
+        results["write_ms"] = await bench_writes(hass, hub, holding, args.writes)
+        await hub.async_close()
+        await slow_hub.async_close()
+        return results
+    finally:
+        for stand_in in (server, slow_server):
+            stand_in.shutdown()
+            stand_in.server_close()
+
+
+def main():
+    """Parse the arguments, run the benchmarks and write JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--port", type=int, default=15502, help="port of the stand-in, the slow one uses the next"
+    )
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument(
+        "--latency", type=float, default=40, help="round trip of the slow link in ms"
+    )
+    parser.add_argument("--slow-polls", type=int, default=25)
+    parser.add_argument("--decodes", type=int, default=2000)
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    report = {
+        "version": json.loads(MANIFEST.read_text())["version"],
+        "python": platform.python_version(),
+        "pymodbus": pymodbus.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "parameters": vars(args),
+        "results": asyncio.run(run(args)),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
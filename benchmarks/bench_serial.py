@@ -0,0 +1,169 @@
+"""Benchmark Modbus RTU polling against the simulator on a pseudo terminal.
+
+Polls every tier of a Gen3 X1 through the real hub and
+SolaXModbusSerialConnection from the RTU stand-in of benchmarks.simulator,
+then reads the same blocks through a stock pymodbus serial client, whose
+framer sleeps the whole silent interval before every frame. Reports the
+transactions per second of both and the gaps between frames the stand-in
+saw; a gap shorter than the silent interval of the baud rate would let
+two frames run together on a real bus. The stand-in runs in a process of
+its own, so the client threads do not delay its timestamps.
+
+A pseudo terminal moves bytes at memory speed whatever the baud rate, so
+the rates measure the pacing between frames, not the line. Unix only, run
+from the repository root with Home Assistant and pymodbus installed:
+
+    python -m benchmarks.bench_serial --baudrate 9600
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import platform
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pymodbus
+from pymodbus.client.sync import ModbusSerialClient
+
+from solax_modbus import SolaXModbusHub
+from solax_modbus.connection import async_get_serial_connection
+from solax_modbus.const import DEFAULT_UNIT_ID, REG_HOLDING
+
+from .bench_hub import _create_hass
+from .simulator import FaultProfile, InverterModel, RtuSimulator, SimulatedInverter
+
+MANIFEST = Path(__file__).parent.parent / "solax_modbus" / "manifest.json"
+
+
+def _serve_rtu(pipe):
+    """Run the RTU stand-in, sending its port, then its frames on every request."""
+    asyncio.run(_async_serve_rtu(pipe))
+
+
+async def _async_serve_rtu(pipe):
+    inverter = SimulatedInverter(
+        InverterModel(random.Random(1)), FaultProfile(), random.Random(2)
+    )
+    simulator = RtuSimulator(inverter)
+    simulator.start()
+    pipe.send(simulator.port)
+    try:
+        while await asyncio.get_running_loop().run_in_executor(None, pipe.recv):
+            pipe.send((inverter.counters["requests"], simulator.gaps))
+            inverter.counters["requests"] = 0
+            simulator.gaps = []
+    finally:
+        simulator.close()
+
+
+def _frames(stand_in, elapsed, silent_interval):
+    """Return the transaction rate and gaps since the last call."""
+    stand_in.send(True)
+    requests, gaps = stand_in.recv()
+    if not gaps:
+        return {}
+    return {
+        "transactions_per_second": requests / elapsed,
+        "gap_ms_min": min(gaps) * 1000,
+        "gap_ms_mean": sum(gaps) / len(gaps) * 1000,
+        "gaps_short": sum(gap < silent_interval for gap in gaps),
+    }
+
+
+async def bench_hub(hub, polls):
+    """Poll every tier back to back; return the elapsed seconds."""
+    started = time.perf_counter()
+    for _ in range(polls):
+        hub._identity_read = False
+        hub._config_read_at = None
+        if not await hub.async_read_modbus_data():
+            raise RuntimeError("poll failed")
+    return time.perf_counter() - started
+
+
+def bench_pymodbus(port, baudrate, blocks, polls):
+    """Read blocks polls times with a stock pymodbus client; return the seconds."""
+    client = ModbusSerialClient(method="rtu", port=port, baudrate=baudrate, timeout=1)
+    if not client.connect():
+        raise RuntimeError(f"cannot open {port}")
+    try:
+        started = time.perf_counter()
+        for _ in range(polls):
+            for block in blocks:
+                read = (
+                    client.read_holding_registers
+                    if block.register_type == REG_HOLDING
+                    else client.read_input_registers
+                )
+                if read(block.address, block.count, unit=DEFAULT_UNIT_ID).isError():
+                    raise RuntimeError(f"stock read of {block} failed")
+        return time.perf_counter() - started
+    finally:
+        client.close()
+
+
+async def run(args):
+    """Run both benchmarks and return the results."""
+    stand_in, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve_rtu, args=(child,), daemon=True)
+    process.start()
+    try:
+        port = stand_in.recv()
+        hass = _create_hass(tempfile.mkdtemp())
+        connection = async_get_serial_connection(hass, port, args.baudrate)
+        hub = SolaXModbusHub(
+            hass, "BenchSerial", port, None, 2, read_gen3x1=True, connection=connection
+        )
+        if not await hub.async_read_modbus_data():
+            raise RuntimeError(f"cannot poll the stand-in on {port}")
+        silent_interval = connection._client.silent_interval
+        _frames(stand_in, 1, silent_interval)
+        blocks = [decoder.block for decoder in hub._block_decoders]
+
+        elapsed = await bench_hub(hub, args.polls)
+        results = {
+            "silent_interval_ms": silent_interval * 1000,
+            "blocks": len(blocks),
+            "hub": _frames(stand_in, elapsed, silent_interval),
+        }
+        await hub.async_close()
+        elapsed = await hass.async_add_executor_job(
+            bench_pymodbus, port, args.baudrate, blocks, args.polls
+        )
+        results["pymodbus"] = _frames(stand_in, elapsed, silent_interval)
+        return results
+    finally:
+        stand_in.send(False)
+        process.join(5)
+
+
+def main():
+    """Parse the arguments, run the benchmarks and write JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baudrate", type=int, default=9600)
+    parser.add_argument("--polls", type=int, default=50)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    report = {
+        "version": json.loads(MANIFEST.read_text())["version"],
+        "python": platform.python_version(),
+        "pymodbus": pymodbus.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "parameters": vars(args),
+        "results": asyncio.run(run(args)),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Realistic SolaX register images for the benchmarks.
+
+The images are built from decoded values through the register map, so they
+stay in step with const.py: every value below is what the integration
+should decode from the image.
+"""
+from solax_modbus.const import (
+    REG_HOLDING,
+    REG_INPUT,
+    REGISTER_MAPS,
+    REGISTER_RTC,
+    REGISTER_S16,
+    REGISTER_STR,
+    REGISTER_TIME,
+)
+from solax_modbus.decoder import register_length
+
+IMAGE_SIZE = 0x120
+
+# A Gen3 X1 hybrid around midday: PV producing, battery charging, exporting.
+DAYTIME = {
+    REG_HOLDING: {
+        "seriesnumber": "H1E502I1234567",
+        "factoryname": "SolaX Power  ",
+        "modulename": "H1E502I1234567",
+        "firmwareversion_invertermaster": 3,
+        "firmwareversion_modbustcp_major": 2,
+        "firmwareversion_modbustcp_minor": 19,
+        "firmwareversion_manager": 7,
+        "myaddress": 1,
+        "rtc": (12, 30, 45, 18, 10, 21),
+        "charger_use_mode": "Self Use Mode",
+        "battery_min_capacity": 10,
+        "battery_type": "Lithium",
+        "battery_charge_float_voltage": 52.0,
+        "battery_discharge_cut_off_voltage": 42.0,
+        "battery_charge_max_current": 20.0,
+        "battery_discharge_max_current": 20.0,
+        "charger_start_time_1": (2, 0),
+        "charger_end_time_1": (5, 30),
+        "charger_start_time_2": (0, 0),
+        "charger_end_time_2": (0, 0),
+        "registration_code": "SXABCDEFGH",
+        "allow_grid_charge": "Charger Time 1",
+        "export_control_factory_limit": 600.0,
+        "export_control_user_limit": 500.0,
+        "eps_mute": "Off",
+        "eps_set_frequency": "50Hz",
+        "inverter_rate_power": 5000,
+        "backup_gridcharge": "Disabled",
+        "backup_charge_start": (0, 0),
+        "backup_charge_end": (0, 0),
+        "forcetime_period_1_max_capacity": 100,
+        "forcetime_period_2_max_capacity": 100,
+    },
+    REG_INPUT: {
+        "inverter_voltage": 241.3,
+        "inverter_current": 14.2,
+        "inverter_load": 3390,
+        "pv_voltage_1": 356.8,
+        "pv_voltage_2": 348.1,
+        "pv_current_1": 6.4,
+        "pv_current_2": 6.1,
+        "grid_frequency": 50.02,
+        "inverter_temperature": 41,
+        "run_mode": "Normal Mode",
+        "pv_power_1": 2283,
+        "pv_power_2": 2123,
+        "battery_voltage_charge": 51.6,
+        "battery_current_charge": 18.7,
+        "battery_power_charge": 965,
+        "bms_connect_state": "Connected",
+        "battery_temperature": 24,
+        "battery_capacity_charge": 63,
+        "output_energy_charge_today": 0.4,
+        "input_energy_charge_today": 3.1,
+        "bms_charge_max_current": 25.0,
+        "bms_discharge_max_current": 25.0,
+        "feedin_power": 2150,
+        "feedin_energy_total": 534.52,
+        "consumed_energy_total": 410.17,
+        "eps_voltage": 0.0,
+        "eps_frequency": 0.0,
+        "energy_today": 11.2,
+        "lock_state": "Unlocked",
+        "bus_volt": 402.5,
+        "grid_voltage_r": 241.3,
+        "grid_current_r": 9.1,
+        "grid_power_r": 2150,
+        "grid_frequency_r": 50.02,
+        "solar_energy_total": 5521.3,
+        "solar_energy_today": 14.8,
+        "export_energy_today": 6.41,
+        "import_energy_today": 0.87,
+    },
+}
+
+
+def _raw(register, value):
+    """Return the raw register words of a decoded value."""
+    if register.unit == REGISTER_STR:
+        data = value.encode("ascii").ljust(register.length * 2)
+        return [(data[i] << 8) | data[i + 1] for i in range(0, len(data), 2)]
+    if register.unit == REGISTER_TIME:
+        return list(value)
+    if register.unit == REGISTER_RTC:
+        hours, minutes, seconds, days, months, years = value
+        return [seconds, minutes, hours, days, months, years]
+    if register.options is not None:
+        return [next(raw for raw, option in register.options.items() if option == value)]
+    raw = round(value / register.scale)
+    if register.unit == REGISTER_S16 and raw < 0:
+        raw += 0x10000
+    assert 0 <= raw <= 0xFFFF, register.key
+    return [raw]
+
+
+def build_image(register_type, values, size=IMAGE_SIZE):
+    """Return the register words holding values, zero elsewhere."""
+    image = [0] * size
+    registers = {register.key: register for register in REGISTER_MAPS[register_type]}
+    for key, value in values.items():
+        register = registers[key]
+        words = _raw(register, value)
+        assert len(words) == register_length(register), key
+        image[register.address:register.address + len(words)] = words
+    return image
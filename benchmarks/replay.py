@@ -0,0 +1,107 @@
+"""Replay a raw register recording through the decoder.
+
+Reads the ring file written by the record_registers option, decodes every
+frame with the block decoder of the integration and prints one JSON line
+per frame, optionally only some keys:
+
+    python -m benchmarks.replay solax_modbus_SolaX.rec --keys battery_capacity_charge
+
+With --benchmark the frames are decoded repeatedly instead and the decode
+time is reported as JSON.
+"""
+import argparse
+import datetime
+import json
+import time
+
+from solax_modbus.const import REG_HOLDING, REG_INPUT, REGISTER_MAPS, SolaXModbusBlock
+from solax_modbus.decoder import SolaXModbusBlockDecoder
+from solax_modbus.recorder import read_frames
+
+REGISTER_TYPES = {3: REG_HOLDING, 4: REG_INPUT}
+
+
+class ReplayDecoders(dict):
+    """Block decoders by function code, address and count, built on demand."""
+
+    def __init__(self, gen2=False):
+        super().__init__()
+        self._gen2 = gen2
+
+    def __missing__(self, block):
+        function_code, address, count = block
+        register_type = REGISTER_TYPES[function_code]
+        decoder = SolaXModbusBlockDecoder(
+            SolaXModbusBlock(register_type, address, count),
+            REGISTER_MAPS[register_type],
+            self._gen2,
+        )
+        self[block] = decoder
+        return decoder
+
+
+def replay(frames, decoders, keys=None):
+    """Yield the time, block and decoded values of every frame."""
+    for timestamp, function_code, address, registers in frames:
+        decoder = decoders[function_code, address, len(registers)]
+        values = decoder.decode(registers)
+        if keys is not None:
+            values = {key: value for key, value in values.items() if key in keys}
+            if not values:
+                continue
+        block = decoder.block
+        yield timestamp, f"{block.register_type} {block.address:#x}+{block.count}", values
+
+
+def main():
+    """Print the decoded frames or the decode benchmark as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--gen2", action="store_true", help="use the Gen2 scales")
+    parser.add_argument("--keys", help="comma separated keys to print")
+    parser.add_argument(
+        "--benchmark", type=int, metavar="ROUNDS", help="time ROUNDS decodes of all frames"
+    )
+    args = parser.parse_args()
+
+    frames = list(read_frames(args.path))
+    decoders = ReplayDecoders(args.gen2)
+
+    if args.benchmark:
+        for _ in replay(frames, decoders):
+            pass
+        started = time.perf_counter()
+        for _ in range(args.benchmark):
+            for _ in replay(frames, decoders):
+                pass
+        elapsed = time.perf_counter() - started
+        print(
+            json.dumps(
+                {
+                    "frames": len(frames),
+                    "blocks": len(decoders),
+                    "rounds": args.benchmark,
+                    "decode_us_per_frame": elapsed / (args.benchmark * len(frames)) * 1e6
+                    if frames
+                    else None,
+                },
+                indent=2,
+            )
+        )
+        return
+
+    keys = set(args.keys.split(",")) if args.keys else None
+    for timestamp, block, values in replay(frames, decoders, keys):
+        print(
+            json.dumps(
+                {
+                    "time": datetime.datetime.fromtimestamp(timestamp).isoformat(),
+                    "block": block,
+                    "values": values,
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
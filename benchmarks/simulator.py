@@ -0,0 +1,453 @@
+"""Fault-injecting SolaX inverter simulator for load and resilience testing.
+
+Serves the holding blocks 0x0, 0x7d and 0xfd and the input blocks 0x0 and
+0x66 over Modbus TCP, or over Modbus RTU on pseudo terminals with --rtu.
+The input registers follow a Gen3 X1 hybrid through a
+simulated day: PV follows the sun with drifting cloud cover, the house load
+wanders and the battery state of charge integrates what it charges and
+discharges. Written settings read back at their read addresses.
+
+Every request can be delayed and answered with a fault: no response, part
+of the response, an exception response or a reset connection. The
+probabilities are per request, and with --seed the faults and values
+repeat from run to run. Start many instances on consecutive ports with
+--instances for scale tests:
+
+    python -m benchmarks.simulator --port 5020 --instances 20 --latency 40 --drop 0.01
+
+With --rtu each instance is an inverter alone on an RS485 bus behind a
+pseudo terminal, whose path is logged; open it like a serial port at any
+baud rate. A serial line cannot be reset, so a reset drops the response.
+"""
+import argparse
+import asyncio
+import logging
+import math
+import os
+import random
+import signal
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusSlaveContext
+from pymodbus.factory import ServerDecoder
+from pymodbus.framer.rtu_framer import ModbusRtuFramer
+from pymodbus.framer.socket_framer import ModbusSocketFramer
+from pymodbus.pdu import ExceptionResponse, ModbusExceptions
+
+from solax_modbus.const import (
+    REG_HOLDING,
+    REG_INPUT,
+    REGISTER_MAPS,
+    REGISTER_U16,
+    WRITE_READBACK,
+)
+
+from .images import DAYTIME, build_image
+
+_LOGGER = logging.getLogger(__name__)
+
+FAULT_RESET = "reset"
+FAULT_DROP = "drop"
+FAULT_PARTIAL = "partial"
+FAULT_EXCEPTION = "exception"
+
+READ_INPUT_REGISTERS = 4
+
+
+@dataclass
+class FaultProfile:
+    """Delay and fault probabilities applied to every request."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    reset: float = 0.0
+    drop: float = 0.0
+    partial: float = 0.0
+    exception: float = 0.0
+    exception_code: int = ModbusExceptions.SlaveBusy
+
+    def delay(self, rng):
+        """Return the response delay in seconds."""
+        return max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+
+    def pick(self, rng):
+        """Return the fault of one request, or None to answer it normally."""
+        draw = rng.random()
+        for fault, probability in (
+            (FAULT_RESET, self.reset),
+            (FAULT_DROP, self.drop),
+            (FAULT_PARTIAL, self.partial),
+            (FAULT_EXCEPTION, self.exception),
+        ):
+            if draw < probability:
+                return fault
+            draw -= probability
+        return None
+
+
+class InverterModel:
+    """A Gen3 X1 hybrid whose PV, load and battery evolve over a simulated day."""
+
+    PEAK_PV = 5000
+    BATTERY_CAPACITY = 5800
+    BATTERY_MAX_POWER = 3000
+    BATTERY_VOLTAGE = 51.6
+    GRID_VOLTAGE = 241.3
+    MIN_SOC = 10
+
+    def __init__(self, rng, speed=60, start_hour=12.0, soc=63.0):
+        """Start at start_hour, running speed simulated seconds per second."""
+        self._rng = rng
+        self._speed = speed
+        self._clock = start_hour * 3600
+        self._last = time.monotonic()
+        self._cloud = 1.0
+        self.soc = soc
+        self.load = 600.0
+        self.pv = 0.0
+        self.battery = 0.0
+        self._values = dict(DAYTIME[REG_INPUT])
+        self._wrap = {
+            register.key: 0x10000 * register.scale
+            for register in REGISTER_MAPS[REG_INPUT]
+            if register.unit == REGISTER_U16 and register.options is None
+        }
+        self.step()
+
+    def step(self):
+        """Advance the model to now and return the input register values."""
+        now = time.monotonic()
+        seconds = (now - self._last) * self._speed
+        self._last = now
+        previous_clock = self._clock
+        self._clock = (self._clock + seconds) % 86400
+        if self._clock < previous_clock:
+            for key in (
+                "energy_today",
+                "solar_energy_today",
+                "export_energy_today",
+                "import_energy_today",
+                "output_energy_charge_today",
+                "input_energy_charge_today",
+            ):
+                self._values[key] = 0.0
+
+        hour = self._clock / 3600
+        sun = max(0.0, math.sin(math.pi * (hour - 6) / 12))
+        self._cloud = min(1.0, max(0.2, self._cloud + self._rng.gauss(0, 0.05)))
+        self.pv = self.PEAK_PV * sun * self._cloud
+        self.load = min(4000.0, max(200.0, self.load + self._rng.gauss(0, 50)))
+
+        surplus = self.pv - self.load
+        battery = max(-self.BATTERY_MAX_POWER, min(self.BATTERY_MAX_POWER, surplus))
+        if (battery > 0 and self.soc >= 100) or (battery < 0 and self.soc <= self.MIN_SOC):
+            battery = 0.0
+        self.battery = battery
+        hours = seconds / 3600
+        self.soc = min(
+            100.0,
+            max(self.MIN_SOC, self.soc + battery * hours / self.BATTERY_CAPACITY * 100),
+        )
+        feedin = surplus - battery
+        inverter = self.pv - battery
+
+        values = self._values
+        for key, power in (
+            ("solar_energy_total", self.pv),
+            ("solar_energy_today", self.pv),
+            ("energy_today", self.pv),
+            ("feedin_energy_total", max(feedin, 0)),
+            ("export_energy_today", max(feedin, 0)),
+            ("consumed_energy_total", max(-feedin, 0)),
+            ("import_energy_today", max(-feedin, 0)),
+            ("input_energy_charge_today", max(battery, 0)),
+            ("output_energy_charge_today", max(-battery, 0)),
+        ):
+            values[key] = (values[key] + power * hours / 1000) % self._wrap[key]
+
+        pv_voltage = 300 + 60 * sun if self.pv else 0.0
+        pv_power_1 = self.pv * 0.52
+        pv_power_2 = self.pv - pv_power_1
+        values.update(
+            {
+                "run_mode": "Normal Mode" if self.pv or battery else "Waiting",
+                "pv_voltage_1": pv_voltage,
+                "pv_voltage_2": pv_voltage * 0.97,
+                "pv_power_1": round(pv_power_1),
+                "pv_power_2": round(pv_power_2),
+                "pv_current_1": pv_power_1 / pv_voltage if pv_voltage else 0.0,
+                "pv_current_2": pv_power_2 / (pv_voltage * 0.97) if pv_voltage else 0.0,
+                "inverter_load": round(inverter),
+                "inverter_current": inverter / self.GRID_VOLTAGE,
+                "inverter_temperature": round(30 + self.pv / 400),
+                "battery_power_charge": round(battery),
+                "battery_current_charge": battery / self.BATTERY_VOLTAGE,
+                "battery_capacity_charge": round(self.soc),
+                "feedin_power": round(feedin),
+                "grid_power_r": round(feedin),
+                "grid_current_r": feedin / self.GRID_VOLTAGE,
+            }
+        )
+        return values
+
+
+class _SettingsBlock(ModbusSequentialDataBlock):
+    """Holding registers that show written settings at their read addresses."""
+
+    def setValues(self, address, values):
+        super().setValues(address, values)
+        for offset, value in enumerate(values):
+            readback = WRITE_READBACK.get(address + offset)
+            if readback is not None:
+                super().setValues(readback, [value])
+
+
+class SimulatedInverter:
+    """The register image, model and faults of one simulated inverter."""
+
+    def __init__(self, model, faults, rng):
+        """Serve the DAYTIME holding registers and the registers of model."""
+        self.model = model
+        self.faults = faults
+        self.rng = rng
+        self.counters = Counter()
+        self._input = ModbusSequentialDataBlock(0, build_image(REG_INPUT, model.step()))
+        self.context = ModbusSlaveContext(
+            hr=_SettingsBlock(0, build_image(REG_HOLDING, DAYTIME[REG_HOLDING])),
+            ir=self._input,
+            zero_mode=True,
+        )
+
+    def execute(self, request):
+        """Return the response to request."""
+        if request.function_code == READ_INPUT_REGISTERS:
+            self._input.setValues(0, build_image(REG_INPUT, self.model.step()))
+        return request.execute(self.context)
+
+
+class _SimulatorProtocol(asyncio.Protocol):
+    """One Modbus TCP connection to a simulated inverter."""
+
+    def __init__(self, inverter, framer=None):
+        self._inverter = inverter
+        self._framer = framer or ModbusSocketFramer(ServerDecoder())
+        self._transport = None
+        self._previous = None
+
+    def connection_made(self, transport):
+        self._transport = transport
+        self._inverter.counters["connections"] += 1
+
+    def data_received(self, data):
+        self._framer.processIncomingPacket(data, self._request_received, unit=0, single=True)
+
+    def _request_received(self, request):
+        # Responses leave in request order, each after its own delay.
+        self._previous = asyncio.get_running_loop().create_task(
+            self._respond(request, self._previous)
+        )
+
+    async def _respond(self, request, previous):
+        inverter = self._inverter
+        if previous is not None:
+            await previous
+        await asyncio.sleep(inverter.faults.delay(inverter.rng))
+        if self._transport.is_closing():
+            return
+
+        inverter.counters["requests"] += 1
+        fault = inverter.faults.pick(inverter.rng)
+        if fault is not None:
+            inverter.counters[fault] += 1
+        if fault == FAULT_RESET:
+            self._transport.abort()
+            return
+        if fault == FAULT_DROP:
+            return
+
+        if fault == FAULT_EXCEPTION:
+            response = ExceptionResponse(
+                request.function_code, inverter.faults.exception_code
+            )
+        else:
+            response = inverter.execute(request)
+        response.transaction_id = request.transaction_id
+        response.unit_id = request.unit_id
+        packet = self._framer.buildPacket(response)
+        if fault == FAULT_PARTIAL:
+            packet = packet[: inverter.rng.randint(1, len(packet) - 1)]
+        self._transport.write(packet)
+
+
+class RtuSimulator(_SimulatorProtocol):
+    """A simulated inverter on an RS485 bus behind a pseudo terminal.
+
+    The master side of the terminal is the transport of the protocol and
+    the slave side, at port, is the serial port clients open. The gap from
+    the end of every response to the start of the next request is kept in
+    gaps, so clients can be checked for the RTU silent interval.
+    """
+
+    def __init__(self, inverter):
+        # Unix only, like os.openpty; TCP simulators also run on Windows.
+        import tty
+
+        super().__init__(inverter, ModbusRtuFramer(ServerDecoder()))
+        self._master, self._slave = os.openpty()
+        # No echo or newline translation, the bytes go through as sent.
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self.gaps = []
+        self._frame_start = None
+        self._frame_end = None
+        self._closing = False
+        self.connection_made(self)
+
+    def start(self):
+        """Start answering requests on the running loop."""
+        asyncio.get_running_loop().add_reader(self._master, self._read)
+
+    def close(self):
+        """Stop answering and remove the terminal."""
+        self._closing = True
+        asyncio.get_running_loop().remove_reader(self._master)
+        os.close(self._master)
+        os.close(self._slave)
+
+    def _read(self):
+        # The slave stays open here, so reads never fail with EIO when a
+        # client closes the port.
+        data = os.read(self._master, 1024)
+        if self._frame_start is None:
+            self._frame_start = time.monotonic()
+        self.data_received(data)
+
+    def _request_received(self, request):
+        if self._frame_end is not None:
+            self.gaps.append(self._frame_start - self._frame_end)
+        self._frame_start = None
+        super()._request_received(request)
+
+    # Transport of the protocol.
+
+    def write(self, data):
+        """Send data on the bus."""
+        # Taken first: the write can wake the client before it returns.
+        self._frame_end = time.monotonic()
+        os.write(self._master, data)
+
+    def abort(self):
+        """Drop the response, a serial line cannot be reset."""
+
+    def is_closing(self):
+        """Return True once the simulator is closed."""
+        return self._closing
+
+
+async def serve(args):
+    """Serve args.instances simulators until cancelled or terminated."""
+    faults = FaultProfile(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        reset=args.reset,
+        drop=args.drop,
+        partial=args.partial,
+        exception=args.exception,
+        exception_code=args.exception_code,
+    )
+    loop = asyncio.get_running_loop()
+    servers = {}
+    simulators = {}
+    for instance in range(args.instances):
+        seed = None if args.seed is None else f"{args.seed}-{instance}"
+        inverter = SimulatedInverter(
+            InverterModel(random.Random(seed), args.speed, args.start_hour),
+            faults,
+            random.Random(None if seed is None else f"{seed}-faults"),
+        )
+        if args.rtu:
+            simulator = RtuSimulator(inverter)
+            simulator.start()
+            simulators[simulator.port] = (simulator, inverter)
+            continue
+        port = args.port + instance
+        servers[port] = (
+            await loop.create_server(
+                lambda inverter=inverter: _SimulatorProtocol(inverter), args.host, port
+            ),
+            inverter,
+        )
+    if args.rtu:
+        _LOGGER.warning(
+            "Simulating %s inverters on %s", args.instances, ", ".join(simulators)
+        )
+    else:
+        _LOGGER.warning(
+            "Simulating %s inverters on %s:%s-%s",
+            args.instances,
+            args.host,
+            args.port,
+            args.port + args.instances - 1,
+        )
+    stopped = asyncio.Event()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, stopped.set)
+    except NotImplementedError:
+        # Windows has no signal handlers in asyncio; stop with Ctrl+C.
+        pass
+    try:
+        await stopped.wait()
+    finally:
+        for port, (server, inverter) in servers.items():
+            server.close()
+            _LOGGER.warning("Port %s: %s", port, dict(inverter.counters))
+        for port, (simulator, inverter) in simulators.items():
+            simulator.close()
+            _LOGGER.warning(
+                "%s: %s, shortest gap %.2f ms",
+                port,
+                dict(inverter.counters),
+                min(simulator.gaps, default=0) * 1000,
+            )
+
+
+def main():
+    """Parse the arguments and run the simulators."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5020)
+    parser.add_argument("--instances", type=int, default=1)
+    parser.add_argument(
+        "--rtu", action="store_true", help="serve Modbus RTU on pseudo terminals"
+    )
+    parser.add_argument("--seed", help="repeat the values and faults of a run")
+    parser.add_argument(
+        "--speed", type=float, default=60, help="simulated seconds per second"
+    )
+    parser.add_argument("--start-hour", type=float, default=12.0)
+    parser.add_argument("--latency", type=float, default=0, help="response delay in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="delay spread in ms")
+    parser.add_argument("--reset", type=float, default=0, help="probability of a reset")
+    parser.add_argument("--drop", type=float, default=0, help="probability of no response")
+    parser.add_argument(
+        "--partial", type=float, default=0, help="probability of a truncated response"
+    )
+    parser.add_argument(
+        "--exception", type=float, default=0, help="probability of an exception response"
+    )
+    parser.add_argument(
+        "--exception-code", type=int, default=ModbusExceptions.SlaveBusy
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,52 @@
 """The SolaX Modbus Integration."""
 import asyncio
 import logging
-import threading
+import time
 from datetime import timedelta
 from typing import Optional
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT, CONF_SCAN_INTERVAL
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_track_time_interval
-from pymodbus.client.sync import ModbusTcpClient
-from pymodbus.constants import Endian
-from pymodbus.exceptions import ConnectionException
-from pymodbus.payload import BinaryPayloadDecoder
+from homeassistant.const import (
+    CONF_HOST,
+    CONF_NAME,
+    CONF_PORT,
+    CONF_SCAN_INTERVAL,
+    CONF_TYPE,
+)
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from pymodbus.pdu import ExceptionResponse, ModbusExceptions
 
 from .const import (
+    ATTR_CYCLES,
     DEFAULT_NAME,
+    DEFAULT_PROFILE_CYCLES,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
+    CONF_ADAPTIVE_SCAN_INTERVAL,
+    CONF_BAUDRATE,
+    CONF_BURST_INTERVAL,
+    CONF_BURST_KEYS,
+    CONF_CONFIG_SCAN_INTERVAL,
+    CONF_MAX_READ_GAP,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_OFFLINE_CYCLES,
+    CONF_PARITY,
+    CONF_EPS_SCAN_INTERVAL,
+    CONF_IDLE_SCAN_INTERVAL,
+    CONF_INTEGRATE_ENERGY,
+    CONF_PIPELINED,
+    CONF_POLLING_PROFILES,
+    CONF_RECORD_REGISTERS,
+    CONF_SERIAL_PORT,
+    CONF_UNIT_ID,
+    CONF_VERIFY_WRITES,
     CONF_READ_GEN2X1,
 	CONF_READ_GEN3X1,
 	CONF_READ_GEN3X3,
@@ -30,15 +57,83 @@ from .const import (
 	DEFAULT_READ_GEN3X3,
 	DEFAULT_READ_X1_EPS,
 	DEFAULT_READ_X3_EPS,
+    ADAPTIVE_SCAN_HEADROOM,
+    ADAPTIVE_SCAN_INTERVAL_MAX,
+    CONNECTION_SERIAL,
+    CONNECTION_TCP,
+    DEFAULT_ADAPTIVE_SCAN_INTERVAL,
+    DEFAULT_BAUDRATE,
+    DEFAULT_BURST_INTERVAL,
+    DEFAULT_BURST_KEYS,
+    DEFAULT_CONFIG_SCAN_INTERVAL,
+    DEFAULT_MAX_READ_GAP,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_OFFLINE_CYCLES,
+    DEFAULT_PARITY,
+    DEFAULT_EPS_SCAN_INTERVAL,
+    DEFAULT_IDLE_SCAN_INTERVAL,
+    DEFAULT_INTEGRATE_ENERGY,
+    DEFAULT_PIPELINED,
+    DEFAULT_POLLING_PROFILES,
+    DEFAULT_RECORD_REGISTERS,
+    DEFAULT_UNIT_ID,
+    DEFAULT_VERIFY_WRITES,
+    EPS_RUN_MODES,
+    GEN3_X1_SENSOR_TYPES,
+    GEN3_X3_SENSOR_TYPES,
+    IDLE_RUN_MODES,
+    MAX_READ_COUNT,
+    MAX_WRITE_COUNT,
+    PARITIES,
+    PIPELINE_FALLBACK_CYCLES,
+    POLL_CONFIG,
+    POLL_IDENTITY,
+    POLL_REALTIME,
+    PROFILE_EPS,
+    PROFILE_IDLE,
+    PROFILE_KEYS,
+    PROFILE_NORMAL,
+    RECORDER_SIZE,
+    REG_HOLDING,
+    REGISTER_BLOCKS,
+    REGISTER_MAPS,
+    SENSOR_TYPES,
+    SERVICE_PROFILE,
+    SolaXModbusBlock,
+    WRITE_DEBOUNCE,
+    WRITE_READBACK,
+    X1_EPS_SENSOR_TYPES,
+    X3_EPS_SENSOR_TYPES,
+)
+from .burst import SolaXModbusBurstSampler, parse_burst_keys
+from .connection import (
+    async_get_connection,
+    async_get_serial_connection,
+    async_release_connection,
+    read_request,
 )
+from .decoder import SolaXModbusBlockDecoder
+from .derived import DERIVED_KEYS, SolaXModbusDerivedData, derive_values
+from .energy import ENERGY_POWER_KEYS, SolaXModbusEnergyIntegrator
+from .planner import plan_blocks
+from .profiler import PHASE_DECODE, PHASE_DISPATCH, PHASE_IO, SolaXModbusProfiler
+from .recorder import SolaXModbusRecorder
+from .stats import SolaXModbusRequestStats, region_key
 
 _LOGGER = logging.getLogger(__name__)
 
 SOLAX_MODBUS_SCHEMA = vol.Schema(
     {
         vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
-        vol.Required(CONF_HOST): cv.string,
-        vol.Required(CONF_PORT): cv.string,
+        vol.Optional(CONF_TYPE, default=CONNECTION_TCP): vol.In(
+            [CONNECTION_TCP, CONNECTION_SERIAL]
+        ),
+        vol.Optional(CONF_HOST): cv.string,
+        vol.Optional(CONF_PORT): cv.string,
+        vol.Optional(CONF_SERIAL_PORT): cv.string,
+        vol.Optional(CONF_BAUDRATE, default=DEFAULT_BAUDRATE): cv.positive_int,
+        vol.Optional(CONF_PARITY, default=DEFAULT_PARITY): vol.In(PARITIES),
+        vol.Optional(CONF_UNIT_ID, default=DEFAULT_UNIT_ID): cv.positive_int,
         vol.Optional(CONF_READ_GEN2X1, default=DEFAULT_READ_GEN2X1): cv.boolean,
         vol.Optional(CONF_READ_GEN3X1, default=DEFAULT_READ_GEN3X1): cv.boolean,
         vol.Optional(CONF_READ_GEN3X3, default=DEFAULT_READ_GEN3X3): cv.boolean,
@@ -47,6 +142,42 @@ SOLAX_MODBUS_SCHEMA = vol.Schema(
         vol.Optional(
             CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL
         ): cv.positive_int,
+        vol.Optional(
+            CONF_ADAPTIVE_SCAN_INTERVAL, default=DEFAULT_ADAPTIVE_SCAN_INTERVAL
+        ): cv.boolean,
+        vol.Optional(
+            CONF_MIN_SCAN_INTERVAL, default=DEFAULT_MIN_SCAN_INTERVAL
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_POLLING_PROFILES, default=DEFAULT_POLLING_PROFILES
+        ): cv.boolean,
+        vol.Optional(
+            CONF_IDLE_SCAN_INTERVAL, default=DEFAULT_IDLE_SCAN_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_EPS_SCAN_INTERVAL, default=DEFAULT_EPS_SCAN_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_CONFIG_SCAN_INTERVAL, default=DEFAULT_CONFIG_SCAN_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_MAX_READ_GAP, default=DEFAULT_MAX_READ_GAP
+        ): cv.positive_int,
+        vol.Optional(CONF_PIPELINED, default=DEFAULT_PIPELINED): cv.boolean,
+        vol.Optional(CONF_VERIFY_WRITES, default=DEFAULT_VERIFY_WRITES): cv.boolean,
+        vol.Optional(
+            CONF_RECORD_REGISTERS, default=DEFAULT_RECORD_REGISTERS
+        ): cv.boolean,
+        vol.Optional(CONF_BURST_KEYS, default=DEFAULT_BURST_KEYS): cv.string,
+        vol.Optional(
+            CONF_INTEGRATE_ENERGY, default=DEFAULT_INTEGRATE_ENERGY
+        ): cv.boolean,
+        vol.Optional(
+            CONF_OFFLINE_CYCLES, default=DEFAULT_OFFLINE_CYCLES
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_BURST_INTERVAL, default=DEFAULT_BURST_INTERVAL
+        ): cv.positive_float,
     }
 )
 
@@ -56,31 +187,143 @@ CONFIG_SCHEMA = vol.Schema(
 
 PLATFORMS = ["number", "select", "sensor"]
 
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Optional(ATTR_CYCLES, default=DEFAULT_PROFILE_CYCLES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+    }
+)
+
 
 async def async_setup(hass, config):
     """Set up the SolaX modbus component."""
     hass.data[DOMAIN] = {}
+
+    async def async_profile(call: ServiceCall):
+        """Profile the next poll cycles of a hub."""
+        name = call.data[CONF_NAME]
+        if name not in hass.data[DOMAIN]:
+            raise HomeAssistantError(f"No SolaX Modbus hub named {name}")
+        hass.data[DOMAIN][name]["hub"].async_start_profiling(call.data[ATTR_CYCLES])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA
+    )
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up a SolaX mobus."""
-    host = entry.data[CONF_HOST]
     name = entry.data[CONF_NAME]
-    port = entry.data[CONF_PORT]
+    # Hubs, devices and entity unique ids are keyed by the name.
+    if name in hass.data[DOMAIN]:
+        _LOGGER.error(
+            "Another SolaX Modbus inverter is already named %s; "
+            "remove this entry and add it again with a different name",
+            name,
+        )
+        return False
+    if entry.data.get(CONF_TYPE, CONNECTION_TCP) == CONNECTION_SERIAL:
+        host = entry.data[CONF_SERIAL_PORT]
+        port = None
+        connection = async_get_serial_connection(
+            hass,
+            host,
+            entry.data.get(CONF_BAUDRATE, DEFAULT_BAUDRATE),
+            entry.data.get(CONF_PARITY, DEFAULT_PARITY),
+        )
+    else:
+        host = entry.data[CONF_HOST]
+        port = entry.data[CONF_PORT]
+        connection = None
     scan_interval = entry.data[CONF_SCAN_INTERVAL]
     read_gen2x1 = entry.data.get(CONF_READ_GEN2X1, False)
     read_gen3x1 = entry.data.get(CONF_READ_GEN3X1, False)
     read_gen3x3 = entry.data.get(CONF_READ_GEN3X3, False)
     read_x1_eps = entry.data.get(CONF_READ_X1_EPS, False)
     read_x3_eps = entry.data.get(CONF_READ_X3_EPS, False)
+    config_scan_interval = entry.data.get(
+        CONF_CONFIG_SCAN_INTERVAL, DEFAULT_CONFIG_SCAN_INTERVAL
+    )
+    max_read_gap = entry.data.get(CONF_MAX_READ_GAP, DEFAULT_MAX_READ_GAP)
+    pipelined = entry.data.get(CONF_PIPELINED, DEFAULT_PIPELINED)
+    unit = entry.data.get(CONF_UNIT_ID, DEFAULT_UNIT_ID)
+    verify_writes = entry.data.get(CONF_VERIFY_WRITES, DEFAULT_VERIFY_WRITES)
+    adaptive_scan_interval = entry.data.get(
+        CONF_ADAPTIVE_SCAN_INTERVAL, DEFAULT_ADAPTIVE_SCAN_INTERVAL
+    )
+    min_scan_interval = entry.data.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL)
+    if entry.data.get(CONF_POLLING_PROFILES, DEFAULT_POLLING_PROFILES):
+        profile_intervals = {
+            PROFILE_IDLE: entry.data.get(CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL),
+            PROFILE_EPS: entry.data.get(CONF_EPS_SCAN_INTERVAL, DEFAULT_EPS_SCAN_INTERVAL),
+        }
+    else:
+        profile_intervals = None
+    if entry.data.get(CONF_RECORD_REGISTERS, DEFAULT_RECORD_REGISTERS):
+        recorder = SolaXModbusRecorder(
+            hass.config.path(f"{DOMAIN}_{name}.rec"), RECORDER_SIZE
+        )
+        await hass.async_add_executor_job(recorder.open)
+    else:
+        recorder = None
+    burst_keys = parse_burst_keys(entry.data.get(CONF_BURST_KEYS, DEFAULT_BURST_KEYS))
+    burst_interval = entry.data.get(CONF_BURST_INTERVAL, DEFAULT_BURST_INTERVAL)
+    if entry.data.get(CONF_INTEGRATE_ENERGY, DEFAULT_INTEGRATE_ENERGY):
+        energy = await SolaXModbusEnergyIntegrator.async_load(hass, name)
+    else:
+        energy = None
+    offline_cycles = entry.data.get(CONF_OFFLINE_CYCLES, DEFAULT_OFFLINE_CYCLES)
 
     _LOGGER.debug("Setup %s.%s", DOMAIN, name)
 
-    hub = SolaXModbusHub(hass, name, host, port, scan_interval, read_gen2x1, read_gen3x1, read_gen3x3, read_x1_eps, read_x3_eps)
+    hub = SolaXModbusHub(
+        hass,
+        name,
+        host,
+        port,
+        scan_interval,
+        read_gen2x1=read_gen2x1,
+        read_gen3x1=read_gen3x1,
+        read_gen3x3=read_gen3x3,
+        read_x1_eps=read_x1_eps,
+        read_x3_eps=read_x3_eps,
+        config_scan_interval=config_scan_interval,
+        max_read_gap=max_read_gap,
+        entry_id=entry.entry_id,
+        pipelined=pipelined,
+        unit=unit,
+        connection=connection,
+        verify_writes=verify_writes,
+        adaptive_scan_interval=adaptive_scan_interval,
+        min_scan_interval=min_scan_interval,
+        profile_intervals=profile_intervals,
+        recorder=recorder,
+        burst_keys=burst_keys,
+        burst_interval=burst_interval,
+        energy=energy,
+        offline_cycles=offline_cycles,
+    )
     """Register the hub."""
     hass.data[DOMAIN][name] = {"hub": hub}
 
+    @callback
+    def async_entity_registry_updated(event):
+        """Re-plan the reads when one of our entities is enabled or disabled."""
+        if event.data["action"] == "update" and "disabled_by" not in event.data.get(
+            "changes", {}
+        ):
+            return
+        registry_entry = er.async_get(hass).async_get(event.data["entity_id"])
+        if registry_entry is None or registry_entry.config_entry_id == entry.entry_id:
+            hub.async_invalidate_read_plan()
+
+    entry.async_on_unload(
+        hass.bus.async_listen(EVENT_ENTITY_REGISTRY_UPDATED, async_entity_registry_updated)
+    )
+
     for component in PLATFORMS:
         hass.async_create_task(
             hass.config_entries.async_forward_entry_setup(entry, component)
@@ -100,12 +343,13 @@ async def async_unload_entry(hass, entry):
     if not unload_ok:
         return False
 
-    hass.data[DOMAIN].pop(entry.data["name"])
+    hub = hass.data[DOMAIN].pop(entry.data["name"])["hub"]
+    await hub.async_close()
     return True
 
 
 class SolaXModbusHub:
-    """Thread safe wrapper class for pymodbus."""
+    """Polls a SolaX inverter and hands the decoded values to its entities."""
 
     def __init__(
         self,
@@ -114,16 +358,49 @@ class SolaXModbusHub:
         host,
         port,
         scan_interval,
+        *,
         read_gen2x1=False,
         read_gen3x1=False,
         read_gen3x3=False,
         read_x1_eps=False,
         read_x3_eps=False,
+        config_scan_interval=DEFAULT_CONFIG_SCAN_INTERVAL,
+        max_read_gap=DEFAULT_MAX_READ_GAP,
+        entry_id=None,
+        pipelined=DEFAULT_PIPELINED,
+        unit=DEFAULT_UNIT_ID,
+        connection=None,
+        verify_writes=DEFAULT_VERIFY_WRITES,
+        adaptive_scan_interval=DEFAULT_ADAPTIVE_SCAN_INTERVAL,
+        min_scan_interval=DEFAULT_MIN_SCAN_INTERVAL,
+        profile_intervals=None,
+        recorder=None,
+        burst_keys=None,
+        burst_interval=DEFAULT_BURST_INTERVAL,
+        energy=None,
+        offline_cycles=DEFAULT_OFFLINE_CYCLES,
     ):
-        """Initialize the Modbus hub."""
+        """Initialize the Modbus hub.
+
+        The options after scan_interval are keyword only.
+        connection is a shared connection to use instead of one to host:port.
+        profile_intervals maps PROFILE_IDLE and PROFILE_EPS to the scan
+        interval used in that profile; None disables polling profiles.
+        recorder is an open SolaXModbusRecorder that gets every response.
+        burst_keys are input registers sampled every burst_interval seconds
+        between polls; their min, max, mean and last sample are published
+        with every poll.
+        energy is a SolaXModbusEnergyIntegrator that integrates the power
+        of every poll and burst sample.
+        The entities are unavailable after offline_cycles failed polls in
+        a row, until a poll succeeds.
+        """
         self._hass = hass
-        self._client = ModbusTcpClient(host=host, port=port, timeout=5)
-        self._lock = threading.Lock()
+        if connection is None:
+            connection = async_get_connection(hass, host, port)
+        self._connection = connection
+        self._connects = 0
+        self._unit = unit
         self._name = name
         self.read_gen2x1 = read_gen2x1
         self.read_gen3x1 = read_gen3x1
@@ -131,766 +408,809 @@ class SolaXModbusHub:
         self.read_x1_eps = read_x1_eps
         self.read_x3_eps = read_x3_eps
         self._scan_interval = timedelta(seconds=scan_interval)
+        self._adaptive_scan_interval = adaptive_scan_interval
+        self._min_scan_interval = min_scan_interval
+        self._cycle_time = None
+        self._link_interval = scan_interval
+        self._profile = PROFILE_NORMAL
+        self._profile_intervals = {
+            PROFILE_NORMAL: min_scan_interval if adaptive_scan_interval else scan_interval,
+            **(profile_intervals or {}),
+        }
+        self._polling_profiles = profile_intervals is not None
+        self._config_scan_interval = config_scan_interval
+        self._identity_read = False
+        self._config_read_at = None
+        self._entry_id = entry_id
+        self._max_read_gap = max_read_gap
+        self._pipelined = pipelined
+        self._pipeline_mismatches = 0
+        self._block_decoders = None
         self._unsub_interval_method = None
-        self._sensors = []
-        self.data = {}
+        self._poll_task = None
+        self._pending_writes = {}
+        self._verify_writes = verify_writes
+        self._readwrite_supported = True
+        self._unsub_write_timer = None
+        self._write_lock = asyncio.Lock()
+        self._listeners = {}
+        self._listener_count = 0
+        self._changed_keys = set()
+        self._deadbands = {
+            description.key: description
+            for sensor_types in (
+                SENSOR_TYPES,
+                GEN3_X1_SENSOR_TYPES,
+                GEN3_X3_SENSOR_TYPES,
+                X1_EPS_SENSOR_TYPES,
+                X3_EPS_SENSOR_TYPES,
+            )
+            for description in sensor_types.values()
+            if description.deadband is not None
+            or description.deadband_relative is not None
+            or description.min_hold is not None
+        }
+        self._published_at = {}
+        self._derived = SolaXModbusDerivedData()
+        self._request_stats = {
+            region_key(region): SolaXModbusRequestStats() for region in REGISTER_BLOCKS
+        }
+        self._overrun_cycles = 0
+        self._failed_cycles = 0
+        self._offline_cycles = offline_cycles
+        self._consecutive_failures = 0
+        self._bytes_transferred = 0
+        self.data_attributes = {}
+        self._profiler = None
+        self._recorder = recorder
+        self._burst = (
+            SolaXModbusBurstSampler(burst_keys, max_read_gap, read_gen2x1)
+            if burst_keys
+            else None
+        )
+        self._burst_interval = timedelta(seconds=burst_interval)
+        self._unsub_burst = None
+        self._burst_task = None
+        self._energy = energy
+        self.data = {
+            "effective_scan_interval": scan_interval,
+            "polling_profile": PROFILE_NORMAL,
+        }
 
     @callback
-    def async_add_solax_modbus_sensor(self, update_callback):
-        """Listen for data updates."""
+    def async_add_solax_modbus_sensor(self, update_callback, key):
+        """Listen for updates of the value behind key."""
         # This is the first sensor, set up interval.
-        if not self._sensors:
-            self.connect()
-            self._unsub_interval_method = async_track_time_interval(
-                self._hass, self.async_refresh_modbus_data, self._scan_interval
-            )
+        if not self._listener_count:
+            self._async_track_polling()
 
-        self._sensors.append(update_callback)
+        self._listeners.setdefault(key, set()).add(update_callback)
+        self._listener_count += 1
+        self.async_invalidate_read_plan()
 
     @callback
-    def async_remove_solax_modbus_sensor(self, update_callback):
+    def async_remove_solax_modbus_sensor(self, update_callback, key):
         """Remove data update."""
-        self._sensors.remove(update_callback)
+        listeners = self._listeners[key]
+        listeners.discard(update_callback)
+        if not listeners:
+            del self._listeners[key]
+        self._listener_count -= 1
+        self.async_invalidate_read_plan()
 
-        if not self._sensors:
+        if not self._listener_count:
             """stop the interval timer upon removal of last sensor"""
+            self._async_stop_polling()
+
+    @callback
+    def _async_track_polling(self):
+        """(Re)start the interval timer with the current scan interval."""
+        if self._unsub_interval_method is not None:
             self._unsub_interval_method()
-            self._unsub_interval_method = None
-            self.close()
+        self._unsub_interval_method = async_track_time_interval(
+            self._hass, self.async_refresh_modbus_data, self._scan_interval
+        )
+        self._async_track_burst()
+
+    @callback
+    def _async_track_burst(self):
+        """Run the burst timer in the normal and EPS polling profiles only.
+
+        The idle profile polls slowly to leave the dongle alone, which
+        sampling every burst_interval would undo.
+        """
+        sampling = self._burst is not None and self._profile in (
+            PROFILE_NORMAL,
+            PROFILE_EPS,
+        )
+        if sampling and self._unsub_burst is None:
+            self._unsub_burst = async_track_time_interval(
+                self._hass, self._async_burst_timer_fired, self._burst_interval
+            )
+        elif not sampling and self._unsub_burst is not None:
+            self._unsub_burst()
+            self._unsub_burst = None
 
     async def async_refresh_modbus_data(self, _now: Optional[int] = None) -> None:
         """Time to update."""
-        if not self._sensors:
+        if not self._listener_count:
             return
 
-        update_result = self.read_modbus_data()
+        if self._poll_task is not None and not self._poll_task.done():
+            _LOGGER.debug("Previous poll of %s still running, skipping", self._name)
+            self._overrun_cycles += 1
+            if self._adaptive_scan_interval:
+                self._async_adapt_scan_interval(None, False)
+            return
+
+        # Taken once, so profiling started during the poll begins with the
+        # next cycle.
+        profiler = self._profiler
+        started = time.monotonic()
+        self._poll_task = self._hass.async_create_task(
+            self.async_read_modbus_data(profiler)
+        )
+        try:
+            update_result = await self._poll_task
+        except asyncio.CancelledError:
+            return
+        finally:
+            self._poll_task = None
 
+        cycle_time = time.monotonic() - started
+        was_available = self.available
         if update_result:
-            for update_callback in self._sensors:
-                update_callback()
+            self._consecutive_failures = 0
+        else:
+            self._failed_cycles += 1
+            self._consecutive_failures += 1
+        self._async_publish_stats(cycle_time)
+        if self._polling_profiles and update_result:
+            self._async_select_profile()
+        if self._adaptive_scan_interval:
+            self._async_adapt_scan_interval(cycle_time, update_result)
+        if self._recorder is not None:
+            self._hass.async_add_executor_job(self._recorder.flush)
+        if self._burst is not None:
+            self._update_data(self._burst.publish())
+        if self._energy is not None:
+            self._update_data(self._energy.values())
+        if self.available != was_available:
+            self._async_availability_changed()
+        if self._changed_keys:
+            if profiler is not None and update_result:
+                profiler.start(PHASE_DISPATCH)
+            self._async_dispatch_changes()
+        if profiler is None:
+            return
+        if not update_result:
+            profiler.fail_cycle()
+        elif profiler.end_cycle():
+            if self._profiler is profiler:
+                self._profiler = None
+            self._hass.async_create_task(self._async_write_profile(profiler))
 
     @property
-    def name(self):
-        """Return the name of this hub."""
-        return self._name
+    def available(self):
+        """Return False once offline_cycles polls in a row have failed."""
+        return self._consecutive_failures < self._offline_cycles
 
-    def close(self):
-        """Disconnect client."""
-        with self._lock:
-            self._client.close()
-
-    def connect(self):
-        """Connect client."""
-        with self._lock:
-            self._client.connect()
-
-    def read_holding_registers(self, unit, address, count):
-        """Read holding registers."""
-        with self._lock:
-            kwargs = {"unit": unit} if unit else {}
-            return self._client.read_holding_registers(address, count, **kwargs)
-    
-    def read_input_registers(self, unit, address, count):
-        """Read input registers."""
-        with self._lock:
-            kwargs = {"unit": unit} if unit else {}
-            return self._client.read_input_registers(address, count, **kwargs)
-
-    def write_register(self, unit, address, payload):
-        """Write registers."""
-        with self._lock:
-            kwargs = {"unit": unit} if unit else {}
-            return self._client.write_register(address, payload, **kwargs)
-
-    def read_modbus_data(self):
- 	
-        try:
-            return self.read_modbus_holding_registers_0() and self.read_modbus_holding_registers_1() and self.read_modbus_holding_registers_2() and self.read_modbus_input_registers_0() and self.read_modbus_input_registers_1()
-        except ConnectionException as ex:
-            _LOGGER.error("Reading data failed! Inverter is offline.")   
+    @callback
+    def _async_availability_changed(self):
+        """Have every entity write its state once for the new availability."""
+        if self.available:
+            _LOGGER.info("%s is back online", self._name)
+        else:
+            _LOGGER.warning(
+                "%s is offline after %s failed polls, entities are unavailable",
+                self._name,
+                self._consecutive_failures,
+            )
+        self._changed_keys.update(self._listeners)
 
-            return True
+    @callback
+    def _async_burst_timer_fired(self, _now):
+        """Sample the burst registers unless a poll or sample is running."""
+        if self._poll_task is not None and not self._poll_task.done():
+            return
+        if self._burst_task is not None and not self._burst_task.done():
+            return
+        if not self._connection.unit_ready(self._unit):
+            return
+        self._burst_task = self._hass.async_create_task(self._async_read_burst())
+
+    async def _async_read_burst(self):
+        """Read the burst registers once and aggregate them."""
+        block_decoders = self._burst.block_decoders
+        try:
+            responses = await self.async_read_blocks(block_decoders)
+        except ConnectionException:
+            return
+        sampled = {}
+        for block_decoder, response in zip(block_decoders, responses):
+            if response.isError():
+                return
+            sampled.update(block_decoder.decode(response.registers))
+        self._burst.add(sampled)
+        if self._energy is not None:
+            self._energy.add({**sampled, **derive_values(sampled)}, time.monotonic())
 
-    def read_modbus_holding_registers_0(self):
+    @property
+    def integrates_energy(self):
+        """Return True if the hub integrates energy totals."""
+        return self._energy is not None
 
-        inverter_data = self.read_holding_registers(unit=1, address=0x0, count=21)
+    @property
+    def burst_keys(self):
+        """Return the sampled keys, or an empty list without burst sampling."""
+        return self._burst.keys if self._burst is not None else []
 
-        if inverter_data.isError():
-            return False
+    @callback
+    def async_start_profiling(self, cycles):
+        """Profile the next cycles poll cycles and write the results to a file."""
+        _LOGGER.info("Profiling the next %s poll cycles of %s", cycles, self._name)
+        self._profiler = SolaXModbusProfiler(cycles)
 
-        decoder = BinaryPayloadDecoder.fromRegisters(
-            inverter_data.registers, byteorder=Endian.Big
+    async def _async_write_profile(self, profiler):
+        """Write the results of a finished profiler to the config directory."""
+        path = self._hass.config.path(
+            f"{DOMAIN}_{self._name}_{time.strftime('%Y%m%d_%H%M%S')}.prof"
+        )
+        summary_path = await self._hass.async_add_executor_job(profiler.write, path)
+        _LOGGER.info(
+            "Profile of %s written to %s, summary in %s", self._name, path, summary_path
         )
 
-        seriesnumber = decoder.decode_string(14).decode("ascii")
-        self.data["seriesnumber"] = str(seriesnumber)
+    @callback
+    def _async_record_request(self, block, latency, response):
+        """Account one block read; response is None if it raised."""
+        self._request_stats[region_key(block)].record(latency, response)
+        self._bytes_transferred += self._connection.REQUEST_SIZE
+        if response is not None and not response.isError():
+            self._bytes_transferred += (
+                self._connection.RESPONSE_OVERHEAD + 2 * block.count
+            )
+
+    @callback
+    def _async_publish_stats(self, cycle_time):
+        """Store the request statistics for the diagnostic sensors."""
+        values = {
+            "cycle_duration": round(cycle_time * 1000, 1),
+            "overrun_cycles": self._overrun_cycles,
+            "failed_cycles": self._failed_cycles,
+            "bytes_transferred": self._bytes_transferred,
+        }
+        for key, stats in self._request_stats.items():
+            values[f"{key}_latency"] = stats.latency
+            values[f"{key}_errors"] = stats.errors
+            self.data_attributes[f"{key}_latency"] = stats.attributes
+            self.data_attributes[f"{key}_errors"] = stats.attributes
+        self._update_data(values)
+
+    @callback
+    def _async_select_profile(self):
+        """Pick the polling profile from the run mode and the PV power.
+
+        EPS modes poll fast, an inverter that is waiting, idle or off with
+        no PV power polls slowly and everything else polls at full rate.
+        """
+        run_mode = self.data.get("run_mode")
+        if run_mode in EPS_RUN_MODES:
+            profile = PROFILE_EPS
+        elif run_mode in IDLE_RUN_MODES and not self.data.get("pv_total_power"):
+            profile = PROFILE_IDLE
+        else:
+            profile = PROFILE_NORMAL
+        if profile == self._profile:
+            return
 
-        factoryname = decoder.decode_string(14).decode("ascii")
-        self.data["factoryname"] = str(factoryname)
+        _LOGGER.debug("Polling profile of %s changed to %s", self._name, profile)
+        self._profile = profile
+        self._update_data({"polling_profile": profile})
+        self._async_apply_scan_interval()
+        self._async_track_burst()
 
-        modulename = decoder.decode_string(14).decode("ascii")
-        self.data["modulename"] = str(modulename)
+    @callback
+    def _async_adapt_scan_interval(self, cycle_time, success):
+        """Fit the interval the link sustains to the measured cycle time.
 
-        return True
+        A failed or overrun cycle doubles the interval, up to
+        ADAPTIVE_SCAN_INTERVAL_MAX. After a good cycle the interval shrinks
+        by a quarter at a time towards ADAPTIVE_SCAN_HEADROOM times the
+        smoothed cycle time.
+        """
+        if cycle_time is not None and success:
+            if self._cycle_time is None:
+                self._cycle_time = cycle_time
+            else:
+                self._cycle_time += 0.3 * (cycle_time - self._cycle_time)
 
-    def read_modbus_holding_registers_1(self):
-    	
-        if self.read_gen2x1 == True:
-            mult = 0.01
+        interval = self._scan_interval.total_seconds()
+        if not success:
+            link_interval = min(ADAPTIVE_SCAN_INTERVAL_MAX, interval * 2)
         else:
-            mult = 0.1
+            target = self._cycle_time * ADAPTIVE_SCAN_HEADROOM
+            link_interval = self._link_interval
+            link_interval = target if target > link_interval else max(target, link_interval * 0.75)
+        self._link_interval = link_interval
+        self._async_apply_scan_interval()
 
-        inverter_data = self.read_holding_registers(unit=1, address=0x7d, count=64)
+    @callback
+    def _async_apply_scan_interval(self):
+        """Poll at the profile interval, or slower if the link needs it.
 
-        if inverter_data.isError():
-            return False
+        In adaptive mode the normal profile interval is the configured floor.
+        """
+        new_interval = self._profile_intervals[self._profile]
+        if self._adaptive_scan_interval:
+            new_interval = max(new_interval, self._link_interval)
+        interval = self._scan_interval.total_seconds()
+        new_interval = round(new_interval, 1)
+        if new_interval == interval:
+            return
 
-        decoder = BinaryPayloadDecoder.fromRegisters(
-            inverter_data.registers, byteorder=Endian.Big
+        _LOGGER.debug(
+            "Scan interval of %s changed from %s s to %s s", self._name, interval, new_interval
         )
-        
-        firmwareversion_invertermaster = decoder.decode_16bit_uint()
-        self.data["firmwareversion_invertermaster"] = firmwareversion_invertermaster
-        
-        decoder.skip_bytes(6)
-        
-        firmwareversion_modbustcp_major = decoder.decode_16bit_uint()
-        self.data["firmwareversion_modbustcp_major"] = firmwareversion_modbustcp_major
-        
-        firmwareversion_modbustcp_minor = decoder.decode_16bit_uint()
-        self.data["firmwareversion_modbustcp_minor"] = firmwareversion_modbustcp_minor
-        
-        firmwareversion_manager = decoder.decode_16bit_uint()
-        self.data["firmwareversion_manager"] = firmwareversion_manager
-        
-        myaddress = decoder.decode_16bit_uint()
-        self.data["myaddress"] = myaddress
-        
-        rtc_seconds = decoder.decode_16bit_uint()
-        self.data["rtc_seconds"] = rtc_seconds
-        
-        rtc_minutes = decoder.decode_16bit_uint()
-        rtc_hours = decoder.decode_16bit_uint()
-        rtc_days = decoder.decode_16bit_uint()
-        rtc_months = decoder.decode_16bit_uint()
-        rtc_years = decoder.decode_16bit_uint()
-        
-        self.data["rtc"] = f"{rtc_hours}:{rtc_minutes}:{rtc_seconds} {rtc_days}/{rtc_months}/{rtc_years}"
-        
-        charger_use_modes = decoder.decode_16bit_uint()       
-        if charger_use_modes == 0:
-          self.data["charger_use_mode"] = "Self Use Mode"
-        elif charger_use_modes == 1:
-          self.data["charger_use_mode"] = "Force Time Use"
-        elif charger_use_modes == 2:
-          self.data["charger_use_mode"] = "Back Up Mode"
-        elif charger_use_modes == 3:
-          self.data["charger_use_mode"] = "Feedin Priority"
-        else:
-          self.data["charger_use_mode"] = "Unknown"
-        
-        battery_min_capacity = decoder.decode_16bit_uint()
-        self.data["battery_min_capacity"] = battery_min_capacity
-        
-        battery_types = decoder.decode_16bit_uint()        
-        if battery_types == 0:
-          self.data["battery_type"] = "Lead Acid"
-        elif battery_types == 1:
-          self.data["battery_type"] = "Lithium"
-        else:
-          self.data["battery_type"] = "Unknown"
-        
-        battery_charge_float_voltage = decoder.decode_16bit_uint()
-        self.data["battery_charge_float_voltage"] = round(battery_charge_float_voltage * 0.1, 1)
-        
-        battery_discharge_cut_off_voltage = decoder.decode_16bit_uint()
-        self.data["battery_discharge_cut_off_voltage"] = round(battery_discharge_cut_off_voltage * 0.1, 1)
-        
-        battery_charge_max_current = decoder.decode_16bit_uint()
-        self.data["battery_charge_max_current"] = round(battery_charge_max_current * mult, 1)
-        
-        battery_discharge_max_current = decoder.decode_16bit_uint()
-        self.data["battery_discharge_max_current"] = round(battery_discharge_max_current * mult, 1)
-        
-        charger_start_time_1_h = decoder.decode_16bit_uint()        
-        charger_start_time_1_m = decoder.decode_16bit_uint()        
-        self.data["charger_start_time_1"] = f"{charger_start_time_1_h}:{charger_start_time_1_m}"
-        
-        charger_end_time_1_h = decoder.decode_16bit_uint()        
-        charger_end_time_1_m = decoder.decode_16bit_uint()
-        self.data["charger_end_time_1"] = f"{charger_end_time_1_h}:{charger_end_time_1_m}"
-        
-        decoder.skip_bytes(8)
-        
-        charger_start_time_2_h = decoder.decode_16bit_uint()        
-        charger_start_time_2_m = decoder.decode_16bit_uint()
-        self.data["charger_start_time_2"] = f"{charger_start_time_2_h}:{charger_start_time_2_m}"
-        
-        charger_end_time_2_h = decoder.decode_16bit_uint()        
-        charger_end_time_2_m = decoder.decode_16bit_uint()
-        self.data["charger_end_time_2"] = f"{charger_end_time_2_h}:{charger_end_time_2_m}"
-        
-        decoder.skip_bytes(34)
-        
-        registration_code = decoder.decode_string(10).decode("ascii")
-        self.data["registration_code"] = str(registration_code)
-        
-        allow_grid_charges = decoder.decode_16bit_uint()
-        if allow_grid_charges == 0:
-          self.data["allow_grid_charge"] = "Forbidden"
-        elif allow_grid_charges == 1:
-          self.data["allow_grid_charge"] = "Charger Time 1"
-        elif allow_grid_charges == 2:
-          self.data["allow_grid_charge"] = "Charger Time 2"
-        elif allow_grid_charges == 3:
-          self.data["allow_grid_charge"] = "Both Charger Time's"
-        else:
-          self.data["allow_grid_charge"] = "Unknown"
-        
-        export_control_factory_limit = decoder.decode_16bit_uint()
-        self.data["export_control_factory_limit"] = round(export_control_factory_limit * 0.1, 1)
-        
-        export_control_user_limit = decoder.decode_16bit_uint()
-        self.data["export_control_user_limit"] = round(export_control_user_limit * 0.1, 1)
-        
-        eps_mutes = decoder.decode_16bit_uint()
-        if eps_mutes == 0:
-          self.data["eps_mute"] = "Off"
-        elif eps_mutes == 1:
-          self.data["eps_mute"] = "On"
-        else:
-          self.data["eps_mute"] = "Unknown"
-        
-        eps_set_frequencys = decoder.decode_16bit_uint()
-        if eps_set_frequencys == 0:
-          self.data["eps_set_frequency"] = "50Hz"
-        elif eps_set_frequencys == 1:
-          self.data["eps_set_frequency"] = "60Hz"
-        else:
-          self.data["eps_set_frequency"] = "Unknown"
-        
-        decoder.skip_bytes(2)
-        
-        inverter_rate_power = decoder.decode_16bit_uint()
-        self.data["inverter_rate_power"] = inverter_rate_power
-        
-        languages = decoder.decode_16bit_uint()
-        if languages == 0:
-          self.data["language"] = "English"
-        elif languages == 1:
-          self.data["language"] = "Deutsche"
-        elif languages == 2:
-          self.data["language"] = "Francais"
-        elif languages == 3:
-          self.data["language"] = "Polskie"
-        else:
-          self.data["language"] = languages
+        self._scan_interval = timedelta(seconds=new_interval)
+        self._update_data({"effective_scan_interval": new_interval})
+        self._async_track_polling()
 
-        return True
+    @callback
+    def _async_dispatch_changes(self):
+        """Notify only the entities whose value changed in this poll."""
+        changed_keys, self._changed_keys = self._changed_keys, set()
+        for key in changed_keys:
+            for update_callback in self._listeners.get(key, ()):
+                update_callback()
 
-    def read_modbus_holding_registers_2(self):
+    def _update_data(self, values):
+        """Store new values and remember the keys that changed."""
+        data = self.data
+        deadbands = self._deadbands
+        now = time.monotonic()
+        for key, value in values.items():
+            if key in data:
+                if data[key] == value:
+                    continue
+                if key in deadbands and not self._is_significant(
+                    deadbands[key], key, data[key], value, now
+                ):
+                    continue
+            data[key] = value
+            self._published_at[key] = now
+            self._changed_keys.add(key)
 
-        inverter_data = self.read_holding_registers(unit=1, address=0xfd, count=25)
+    def _is_significant(self, description, key, published, value, now):
+        """Return True if value may replace the published value of key."""
+        if (
+            description.min_hold is not None
+            and now - self._published_at.get(key, 0) < description.min_hold
+        ):
+            return False
+        if not isinstance(published, (int, float)) or not isinstance(value, (int, float)):
+            return True
 
-        if inverter_data.isError():
+        delta = abs(value - published)
+        if description.deadband is not None and delta < description.deadband:
             return False
+        if (
+            description.deadband_relative is not None
+            and delta < abs(published) * description.deadband_relative
+        ):
+            return False
+        return True
+
+    @property
+    def name(self):
+        """Return the name of this hub."""
+        return self._name
+
+    @property
+    def unit(self):
+        """Return the Modbus unit id of the inverter."""
+        return self._unit
+
+    @callback
+    def async_invalidate_read_plan(self):
+        """Plan the reads again before the next poll."""
+        self._block_decoders = None
+
+    @callback
+    def _async_enabled_keys(self):
+        """Return the keys of the enabled entities of this hub."""
+        if self._entry_id is None:
+            return {
+                register.key
+                for register_map in REGISTER_MAPS.values()
+                for register in register_map
+            } | set(DERIVED_KEYS)
+
+        # The polling profile is picked from values that are read even if
+        # their entities are disabled.
+        keys = set(PROFILE_KEYS) if self._polling_profiles else set()
+        if self._energy is not None:
+            keys |= ENERGY_POWER_KEYS
+        prefix = f"{self._name}_"
+        registry = er.async_get(self._hass)
+        return keys | {
+            registry_entry.unique_id[len(prefix):]
+            for registry_entry in er.async_entries_for_config_entry(
+                registry, self._entry_id
+            )
+            if registry_entry.disabled_by is None
+            and registry_entry.unique_id.startswith(prefix)
+        }
 
-        decoder = BinaryPayloadDecoder.fromRegisters(
-            inverter_data.registers, byteorder=Endian.Big
+    @callback
+    def _async_plan_reads(self):
+        """Compile the decode plan for the registers behind enabled entities."""
+        blocks = plan_blocks(self._async_enabled_keys(), self._max_read_gap)
+        self._block_decoders = [
+            SolaXModbusBlockDecoder(
+                block, REGISTER_MAPS[block.register_type], self.read_gen2x1
+            )
+            for block in blocks
+        ]
+        # Newly planned settings and identity values are read right away.
+        self._identity_read = False
+        self._config_read_at = None
+        _LOGGER.debug(
+            "Read plan for %s: %s",
+            self._name,
+            ", ".join(
+                f"{block.register_type} {block.address:#x}+{block.count}"
+                for block in blocks
+            ),
         )
-        
-        backup_gridcharge_s = decoder.decode_16bit_uint()
-        if backup_gridcharge_s == 0:
-          self.data["backup_gridcharge"] = "Disabled"
-        elif backup_gridcharge_s == 1:
-          self.data["backup_gridcharge"] = "Enabled"
-        else:
-          self.data["backup_gridcharge"] = "Unknown"
-        
-        backup_charge_start_h = decoder.decode_16bit_uint()        
-        backup_charge_start_m = decoder.decode_16bit_uint()
-        self.data["backup_charge_start"] = f"{backup_charge_start_h}:{backup_charge_start_m}"
-        
-        backup_charge_end_h = decoder.decode_16bit_uint()        
-        backup_charge_end_m = decoder.decode_16bit_uint()
-        self.data["backup_charge_end"] = f"{backup_charge_end_h}:{backup_charge_end_m}"
-        
-        was4777_power_manager_s = decoder.decode_16bit_uint()
-        if was4777_power_manager_s == 0:
-          self.data["was4777_power_manager"] = "Disabled"
-        elif was4777_power_manager_s == 1:
-          self.data["was4777_power_manager"] = "Enabled"
-        else:
-          self.data["was4777_power_manager"] = "Unknown"
-        
-        cloud_control_s = decoder.decode_16bit_uint()
-        if cloud_control_s == 0:
-          self.data["cloud_control"] = "Disabled"
-        elif cloud_control_s == 1:
-          self.data["cloud_control"] = "Enabled"
-        else:
-          self.data["cloud_control"] = "Unknown"
-        
-        global_mppt_function_s = decoder.decode_16bit_uint()
-        if global_mppt_function_s == 0:
-          self.data["global_mppt_function"] = "Disabled"
-        elif global_mppt_function_s == 1:
-          self.data["global_mppt_function"] = "Enabled"
-        else:
-          self.data["global_mppt_function"] = "Unknown"
-        
-        grid_service_x3_s = decoder.decode_16bit_uint()
-        if grid_service_x3_s == 0:
-          self.data["grid_service_x3"] = "Disabled"
-        elif grid_service_x3_s == 1:
-          self.data["grid_service_x3"] = "Enabled"
-        else:
-          self.data["grid_service_x3"] = "Unknown"
-        
-        phase_power_balance_x3_s = decoder.decode_16bit_uint()
-        if phase_power_balance_x3_s == 0:
-          self.data["phase_power_balance_x3"] = "Disabled"
-        elif phase_power_balance_x3_s == 1:
-          self.data["phase_power_balance_x3"] = "Enabled"
-        else:
-          self.data["phase_power_balance_x3"] = "Unknown"
-        
-        machine_style_s = decoder.decode_16bit_uint()
-        if machine_style_s == 0:
-          self.data["machine_style"] = "X-Hybrid"
-        elif machine_style_s == 1:
-          self.data["machine_style"] = "X-Retro Fit"
-        else:
-          self.data["machine_style"] = "Unknown"
-        
-        meter_function_s = decoder.decode_16bit_uint()
-        if meter_function_s == 0:
-          self.data["meter_function"] = "Disabled"
-        elif meter_function_s == 1:
-          self.data["meter_function"] = "Enabled"
-        else:
-          self.data["meter_function"] = "Unknown"
-          
-        meter_1_id = decoder.decode_16bit_uint()
-        self.data["meter_1_id"] = meter_1_id
-        
-        meter_2_id = decoder.decode_16bit_uint()
-        self.data["meter_2_id"] = meter_2_id
-        
-        power_control_timeout = decoder.decode_16bit_uint()
-        self.data["power_control_timeout"] = power_control_timeout
-        
-        eps_auto_restart_s = decoder.decode_16bit_uint()
-        if eps_auto_restart_s == 0:
-          self.data["eps_auto_restart"] = "Disabled"
-        elif eps_auto_restart_s == 1:
-          self.data["eps_auto_restart"] = "Enabled"
-        else:
-          self.data["eps_auto_restart"] = "Unknown"
-        
-        eps_min_esc_voltage = decoder.decode_16bit_uint()
-        self.data["eps_min_esc_voltage"] = eps_min_esc_voltage
-        
-        eps_min_esc_soc = decoder.decode_16bit_uint()
-        self.data["eps_min_esc_soc"] = eps_min_esc_soc
-        
-        forcetime_period_1_max_capacity = decoder.decode_16bit_uint()
-        self.data["forcetime_period_1_max_capacity"] = forcetime_period_1_max_capacity
-        
-        forcetime_period_2_max_capacity = decoder.decode_16bit_uint()
-        self.data["forcetime_period_2_max_capacity"] = forcetime_period_2_max_capacity
-        
-        disch_cut_off_point_different_s = decoder.decode_16bit_uint()
-        if disch_cut_off_point_different_s == 0:
-          self.data["disch_cut_off_point_different"] = "Disabled"
-        elif disch_cut_off_point_different_s == 1:
-          self.data["disch_cut_off_point_different"] = "Enabled"
-        else:
-          self.data["disch_cut_off_point_different"] = "Unknown"
-        
-        disch_cut_off_capacity_grid_mode = decoder.decode_16bit_uint()
-        self.data["disch_cut_off_capacity_grid_mode"] = disch_cut_off_capacity_grid_mode
-        
-        disch_cut_off_voltage_grid_mode = decoder.decode_16bit_uint()
-        self.data["disch_cut_off_voltage_grid_mode"] = round(disch_cut_off_voltage_grid_mode * 0.1, 1)
-        
-        earth_detect_x3_s = decoder.decode_16bit_uint()
-        if earth_detect_x3_s == 0:
-          self.data["earth_detect_x3"] = "Disabled"
-        elif earth_detect_x3_s == 1:
-          self.data["earth_detect_x3"] = "Enabled"
-        else:
-          self.data["earth_detect_x3"] = "Unknown"
-        
-        ct_meter_setting_s = decoder.decode_16bit_uint()
-        if ct_meter_setting_s == 0:
-          self.data["ct_meter_setting"] = "Meter"
-        elif ct_meter_setting_s == 1:
-          self.data["ct_meter_setting"] = "CT"
-        else:
-          self.data["ct_meter_setting"] = "Unknown"
-        
-        return True
 
-    def read_modbus_input_registers_0(self):
-    	
-        if self.read_gen2x1 == True:
-            mult = 0.01
-        else:
-            mult = 0.1
-        
-        realtime_data = self.read_input_registers(unit=1, address=0x0, count=86)
+    @callback
+    def _async_stop_polling(self):
+        """Stop the interval timer and cancel an in-flight poll."""
+        if self._unsub_interval_method is not None:
+            self._unsub_interval_method()
+            self._unsub_interval_method = None
+        if self._unsub_burst is not None:
+            self._unsub_burst()
+            self._unsub_burst = None
 
-        if realtime_data.isError():
-            return False
+        if self._burst_task is not None and not self._burst_task.done():
+            self._burst_task.cancel()
+        if self._poll_task is not None and not self._poll_task.done():
+            self._poll_task.cancel()
+
+    async def async_close(self):
+        """Stop polling, flush pending writes and release the connection."""
+        self._async_stop_polling()
+        await self.async_flush_writes()
+        await async_release_connection(self._hass, self._connection)
+        if self._recorder is not None:
+            await self._hass.async_add_executor_job(self._recorder.close)
+        if self._energy is not None:
+            await self._energy.async_save()
 
-        decoder = BinaryPayloadDecoder.fromRegisters(
-            realtime_data.registers, byteorder=Endian.Big
+    @callback
+    def async_queue_write(self, address, payload, key=None, to_value=None):
+        """Write a holding register once it has stopped changing.
+
+        Every change restarts a WRITE_DEBOUNCE timer and replaces the
+        pending value of the register, so dragging a slider writes only
+        the value it settles on. Pending writes to adjacent registers are
+        sent together as one write multiple registers request.
+
+        key is the value the caller set optimistically and to_value turns
+        a register value into it. Once the register is read back, key is
+        set from what the inverter holds, whether or not it took payload.
+        """
+        self._pending_writes[address] = (payload, key, to_value)
+        if self._unsub_write_timer is not None:
+            self._unsub_write_timer()
+        self._unsub_write_timer = async_call_later(
+            self._hass, WRITE_DEBOUNCE, self._async_write_timer_fired
         )
 
-        inverter_voltage = decoder.decode_16bit_uint()
-        self.data["inverter_voltage"] = round(inverter_voltage * 0.1, 1)
-        
-        inverter_current = decoder.decode_16bit_int()
-        self.data["inverter_current"] = round(inverter_current * 0.1, 1)
-                
-        inverter_load = decoder.decode_16bit_int()
-        self.data["inverter_load"] = inverter_load
-        
-        pv_voltage_1 = decoder.decode_16bit_uint()
-        self.data["pv_voltage_1"] = round(pv_voltage_1 * 0.1, 1)
-        
-        pv_voltage_2 = decoder.decode_16bit_uint()
-        self.data["pv_voltage_2"] = round(pv_voltage_2 * 0.1, 1)
-        
-        pv_current_1 = decoder.decode_16bit_uint()
-        self.data["pv_current_1"] = round(pv_current_1 * 0.1, 1)
-        
-        pv_current_2 = decoder.decode_16bit_uint()
-        self.data["pv_current_2"] = round(pv_current_2 * 0.1, 1)
-        
-        grid_frequency = decoder.decode_16bit_uint()
-        self.data["grid_frequency"] = round(grid_frequency * 0.01, 2)
-        
-        inverter_temperature = decoder.decode_16bit_int()
-        self.data["inverter_temperature"] = inverter_temperature
-        
-        run_modes = decoder.decode_16bit_uint()
-        if run_modes == 0:
-          self.data["run_mode"] = "Waiting"
-        elif run_modes == 1:
-          self.data["run_mode"] = "Checking"
-        elif run_modes == 2:
-          self.data["run_mode"] = "Normal Mode"
-        elif run_modes == 3:
-          self.data["run_mode"] = "Off Mode"
-        elif run_modes == 4:
-          self.data["run_mode"] = "Permanent Fault Mode"
-        elif run_modes == 5:
-          self.data["run_mode"] = "Update Mode"
-        elif run_modes == 6:
-          self.data["run_mode"] = "EPS Check Mode"
-        elif run_modes == 7:
-          self.data["run_mode"] = "EPS Mode"
-        elif run_modes == 8:
-          self.data["run_mode"] = "Self Test"
-        elif run_modes == 9:
-          self.data["run_mode"] = "Idle Mode"
-        else:
-          self.data["run_mode"] = "Unknown"
-        
-        pv_power_1 = decoder.decode_16bit_uint()
-        self.data["pv_power_1"] = pv_power_1
-        
-        pv_power_2 = decoder.decode_16bit_uint()
-        self.data["pv_power_2"] = pv_power_2
-        
-        self.data["pv_total_power"] = pv_power_1 + pv_power_2
-        
-        decoder.skip_bytes(14)
-        
-        time_count_down = decoder.decode_16bit_uint()
-        self.data["time_count_down"] = round(time_count_down * 0.001, 0)
-        
-        battery_voltage_charge = decoder.decode_16bit_int()
-        self.data["battery_voltage_charge"] = round(battery_voltage_charge * mult, 1)
-        
-        battery_current_charge = decoder.decode_16bit_int()
-        self.data["battery_current_charge"] = round(battery_current_charge * mult, 1)
-        
-        battery_power_charge = decoder.decode_16bit_int()
-        self.data["battery_power_charge"] = battery_power_charge
-        
-        bms_connect_states = decoder.decode_16bit_uint()
-        if bms_connect_states == 0:
-          self.data["bms_connect_state"] = "Disconnected"
-        elif bms_connect_states == 1:
-          self.data["bms_connect_state"] = "Connected"
-        else:
-          self.data["bms_connect_state"] = "Unknown"
-        
-        battery_temperature = decoder.decode_16bit_int()
-        self.data["battery_temperature"] = battery_temperature
-        
-        decoder.skip_bytes(6)
-        
-        battery_capacity_charge = decoder.decode_16bit_uint()
-        self.data["battery_capacity_charge"] = battery_capacity_charge
-        
-        output_energy_charge_lsb = decoder.decode_16bit_uint()
-        self.data["output_energy_charge_lsb"] = round(output_energy_charge_lsb * 0.1, 1)
-        
-        output_energy_charge_msb = decoder.decode_16bit_uint()
-        self.data["output_energy_charge_msb"] = round(output_energy_charge_msb * 0.1, 1)
-        
-        bms_warning_lsb = decoder.decode_16bit_uint()
-        self.data["bms_warning_lsb"] = bms_warning_lsb
-        
-        output_energy_charge_today = decoder.decode_16bit_uint()
-        self.data["output_energy_charge_today"] = round(output_energy_charge_today * 0.1, 1)
-        
-        input_energy_charge_lsb = decoder.decode_16bit_uint()
-        self.data["input_energy_charge_lsb"] = round(input_energy_charge_lsb * 0.1, 1)
-        
-        input_energy_charge_msb = decoder.decode_16bit_uint()
-        self.data["input_energy_charge_msb"] = round(input_energy_charge_msb * 0.1, 1)
-        
-        input_energy_charge_today = decoder.decode_16bit_uint()
-        self.data["input_energy_charge_today"] = round(input_energy_charge_today * 0.1, 1)
-        
-        bms_charge_max_current = decoder.decode_16bit_uint()
-        self.data["BMS Charge Max Current"] = round(bms_charge_max_current * 0.1, 1)
-        
-        bms_discharge_max_current = decoder.decode_16bit_uint()
-        self.data["BMS Discharge Max Current"] = round(bms_discharge_max_current * 0.1, 1)
-        
-        bms_warning_msb = decoder.decode_16bit_uint()
-        self.data["bms_warning_msb"] = bms_warning_msb
-        
-        decoder.skip_bytes(62)
-        
-        feedin_power = decoder.decode_16bit_int()
-        self.data["feedin_power"] = feedin_power
-                
-        if feedin_power > 0:
-          self.data["grid_export"] = feedin_power
-        else:
-          self.data["grid_export"] = 0
-          
-        if feedin_power < 0:
-          self.data["grid_import"] = abs(feedin_power)
-        else:
-          self.data["grid_import"] = 0
-          
-        self.data["house_load"] = inverter_load - feedin_power
-                         
-        feedin_energy_total = decoder.decode_16bit_uint()
-        self.data["feedin_energy_total"] = round(feedin_energy_total * 0.01, 1)
-        
-        decoder.skip_bytes(2)
-                
-        consumed_energy_total = decoder.decode_16bit_uint()
-        self.data["consumed_energy_total"] = round(consumed_energy_total * 0.01, 1)
-        
-        decoder.skip_bytes(2)
-        
-        eps_volatge = decoder.decode_16bit_uint()
-        self.data["eps_volatge"] = round(eps_volatge * 0.1, 1)
-        
-        eps_current = decoder.decode_16bit_uint()
-        self.data["eps_current"] = round(eps_current * 0.1, 1)
-        
-        eps_power = decoder.decode_16bit_uint()
-        self.data["eps_power"] = eps_power
-        
-        eps_current = decoder.decode_16bit_uint()
-        self.data["eps_current"] = round(eps_current * 0.1, 1)
-        
-        eps_frequency = decoder.decode_16bit_uint()
-        self.data["eps_frequency"] = round(eps_frequency * 0.01, 2)
-                
-        energy_today = decoder.decode_16bit_uint()
-        self.data["energy_today"] = round(energy_today * 0.1, 1)
-        
-        decoder.skip_bytes(2)
-        
-        total_energy_to_grid = decoder.decode_16bit_uint()
-        self.data["total_energy_to_grid"] = round(total_energy_to_grid * 0.001, 1)
-        
-        decoder.skip_bytes(2)
-        
-        lock_states = decoder.decode_16bit_uint()
-        if lock_states == 0:
-          self.data["lock_state"] = "Locked"
-        elif lock_states == 1:
-          self.data["lock_state"] = "Unlocked"
+    async def async_flush_writes(self):
+        """Send the pending writes now instead of after the debounce."""
+        if self._unsub_write_timer is not None:
+            self._unsub_write_timer()
+            self._unsub_write_timer = None
+        async with self._write_lock:
+            await self._async_send_writes()
+
+    async def _async_write_timer_fired(self, _now):
+        """Send the writes that have settled."""
+        self._unsub_write_timer = None
+        async with self._write_lock:
+            await self._async_send_writes()
+
+    async def _async_send_writes(self):
+        """Send every pending write, merging runs of adjacent registers."""
+        pending, self._pending_writes = self._pending_writes, {}
+        runs = []
+        for address in sorted(pending):
+            run = runs[-1] if runs else None
+            if (
+                run is not None
+                and address == run[0] + len(run[1])
+                and len(run[1]) < MAX_WRITE_COUNT
+            ):
+                run[1].append(pending[address][0])
+            else:
+                runs.append((address, [pending[address][0]]))
+
+        verified = 0
+        for address, values in runs:
+            readback = await self._async_write_run(address, values)
+            if readback is None:
+                continue
+            verified += 1
+            read_address, registers = readback
+            for offset, payload in enumerate(values):
+                write_address = address + offset
+                actual = registers[WRITE_READBACK[write_address] - read_address]
+                _, key, to_value = pending[write_address]
+                if actual != payload:
+                    _LOGGER.warning(
+                        "%s: register %#x reads back %s after writing %s",
+                        self._name,
+                        write_address,
+                        actual,
+                        payload,
+                    )
+                if key is not None:
+                    self._update_data({key: to_value(actual)})
+        self._async_dispatch_changes()
+
+        if len(runs) > verified:
+            # Read the settings back on the next poll.
+            self._config_read_at = None
+
+    async def _async_write_run(self, address, values):
+        """Write registers from address on.
+
+        With verify_writes, the registers that hold the written settings
+        are read back in the same transaction using read/write multiple
+        registers (function 23); devices without it get a separate read of
+        just that range. Only the keys decoded from that range are updated.
+        Returns the start address and raw registers read back, or None.
+        """
+        write_addresses = range(address, address + len(values))
+        readback = None
+        if self._verify_writes and all(
+            write_address in WRITE_READBACK for write_address in write_addresses
+        ):
+            read_addresses = [WRITE_READBACK[a] for a in write_addresses]
+            read_address = min(read_addresses)
+            read_count = max(read_addresses) + 1 - read_address
+            if read_count <= MAX_READ_COUNT:
+                readback = (read_address, read_count)
+
+        connection = self._connection
+        if readback is not None and self._readwrite_supported:
+            result = await self._async_request(
+                connection.async_readwrite_registers(
+                    self._unit, readback[0], readback[1], address, values
+                )
+            )
+            if not result.isError():
+                return self._async_update_readback(readback, result.registers)
+            if not (
+                isinstance(result, ExceptionResponse)
+                and result.exception_code == ModbusExceptions.IllegalFunction
+            ):
+                # A timeout or a rejected value, not a missing function.
+                _LOGGER.error(
+                    "%s: writing %s to register %#x failed: %s",
+                    self._name,
+                    values,
+                    address,
+                    result,
+                )
+                return None
+            _LOGGER.warning(
+                "%s does not handle read/write multiple registers (%s), "
+                "verifying writes with a separate read",
+                self._name,
+                result,
+            )
+            self._readwrite_supported = False
+
+        if len(values) == 1:
+            result = await self._async_request(
+                connection.async_write_register(self._unit, address, values[0])
+            )
         else:
-          self.data["lock_state"] = "Unknown"
-        
-        return True
-    
-    def read_modbus_input_registers_1(self):
+            result = await self._async_request(
+                connection.async_write_registers(self._unit, address, values)
+            )
+        if result.isError():
+            _LOGGER.error(
+                "%s: writing %s to register %#x failed: %s",
+                self._name,
+                values,
+                address,
+                result,
+            )
+            return None
+        if readback is None:
+            return None
+
+        result = await self._async_request(
+            connection.async_read_holding_registers(self._unit, *readback)
+        )
+        if result.isError():
+            return None
+        return self._async_update_readback(readback, result.registers)
+
+    @staticmethod
+    async def _async_request(request):
+        """Await a request, returning a connection failure as its result."""
+        try:
+            return await request
+        except ConnectionException as ex:
+            return ModbusIOException(str(ex))
+
+    @callback
+    def _async_update_readback(self, readback, registers):
+        """Decode a read back range into the data."""
+        read_address, read_count = readback
+        block_decoder = SolaXModbusBlockDecoder(
+            SolaXModbusBlock(REG_HOLDING, read_address, read_count, POLL_CONFIG),
+            REGISTER_MAPS[REG_HOLDING],
+            self.read_gen2x1,
+        )
+        self._update_data(block_decoder.decode(registers))
+        return read_address, registers
+
+    def _poll_tiers(self, now):
+        """Return the polling tiers due in this cycle."""
+        tiers = {POLL_REALTIME}
+        if not self._identity_read:
+            tiers.add(POLL_IDENTITY)
+        if (
+            self._config_read_at is None
+            or now - self._config_read_at >= self._config_scan_interval
+        ):
+            tiers.add(POLL_CONFIG)
+        return tiers
+
+    async def async_read_modbus_data(self, profiler=None):
+        """Read the due register blocks; return True if all were read.
+
+        profiler, a SolaXModbusProfiler, times the I/O and decode phases.
+        """
+        if not await self._connection.async_ensure_connected(self._unit):
+            return False
+
+        # The identity registers are read again on every new connection.
+        if self._connection.connects != self._connects:
+            self._connects = self._connection.connects
+            self._identity_read = False
+
+        try:
+            if self._block_decoders is None:
+                self._async_plan_reads()
 
-        realtime_data = self.read_input_registers(unit=1, address=0x66, count=54)
+            now = time.monotonic()
+            tiers = self._poll_tiers(now)
+            block_decoders = [
+                block_decoder
+                for block_decoder in self._block_decoders
+                if block_decoder.block.tier in tiers
+            ]
+            if profiler is not None:
+                profiler.start(PHASE_IO)
+            responses = await self.async_read_blocks(block_decoders)
+            if profiler is not None:
+                profiler.start(PHASE_DECODE)
+            polled = {}
+            for block_decoder, response in zip(block_decoders, responses):
+                if response.isError():
+                    return False
+                if self._recorder is not None:
+                    self._recorder.record(
+                        response.function_code,
+                        block_decoder.block.address,
+                        response.registers,
+                    )
+                values = block_decoder.decode(response.registers)
+                polled.update(values)
+                self._update_data(values)
+
+            if POLL_IDENTITY in tiers:
+                self._identity_read = True
+            if POLL_CONFIG in tiers:
+                self._config_read_at = now
 
-        if realtime_data.isError():
+            self._update_derived_data(polled)
+            if self._energy is not None:
+                self._energy.add({**polled, **derive_values(polled)}, time.monotonic())
+            return True
+        except ConnectionException:
             return False
+        finally:
+            if profiler is not None:
+                profiler.stop()
+
+    async def async_read_blocks(self, block_decoders):
+        """Read the blocks of one poll cycle.
+
+        Reading stops at the first error response, which is returned last.
+        Pipelined polls that lose responses are read again serially; after
+        PIPELINE_FALLBACK_CYCLES of them in a row whose serial reads all
+        succeed, the device evidently cannot pipeline and the hub stops.
+        """
+        pipeline_error = None
+        if self._pipelined and len(block_decoders) > 1:
+            requests = [
+                read_request(block_decoder.block, self._unit)
+                for block_decoder in block_decoders
+            ]
+            started = time.monotonic()
+            try:
+                responses = await self._connection.async_execute_pipelined(requests)
+            except (ConnectionException, ModbusIOException) as ex:
+                for block_decoder in block_decoders:
+                    self._async_record_request(
+                        block_decoder.block,
+                        time.monotonic() - started,
+                        ex if isinstance(ex, ModbusIOException) else None,
+                    )
+                if isinstance(ex, ConnectionException):
+                    raise
+                pipeline_error = ex
+            else:
+                self._pipeline_mismatches = 0
+                # The responses arrive together, so they share one latency.
+                latency = time.monotonic() - started
+                for block_decoder, response in zip(block_decoders, responses):
+                    self._async_record_request(block_decoder.block, latency, response)
+                return responses
 
-        decoder = BinaryPayloadDecoder.fromRegisters(
-            realtime_data.registers, byteorder=Endian.Big
+        responses = []
+        for block_decoder in block_decoders:
+            block = block_decoder.block
+            started = time.monotonic()
+            try:
+                if block.register_type == REG_HOLDING:
+                    response = await self._connection.async_read_holding_registers(
+                        unit=self._unit, address=block.address, count=block.count
+                    )
+                else:
+                    response = await self._connection.async_read_input_registers(
+                        unit=self._unit, address=block.address, count=block.count
+                    )
+            except ConnectionException:
+                self._async_record_request(block, time.monotonic() - started, None)
+                raise
+            self._async_record_request(block, time.monotonic() - started, response)
+            responses.append(response)
+            if response.isError():
+                break
+        else:
+            if pipeline_error is not None:
+                self._async_pipeline_mismatch(pipeline_error)
+        return responses
+
+    @callback
+    def _async_pipeline_mismatch(self, error):
+        """Count a pipelined poll that lost responses the serial reads got."""
+        self._pipeline_mismatches += 1
+        if self._pipeline_mismatches < PIPELINE_FALLBACK_CYCLES:
+            _LOGGER.debug(
+                "%s lost pipelined responses (%s) but answered serially",
+                self._name,
+                error,
+            )
+            return
+        _LOGGER.warning(
+            "%s does not handle pipelined requests (%s), "
+            "falling back to serial reads",
+            self._name,
+            error,
         )
-        
-        bus_volt = decoder.decode_16bit_uint()
-        self.data["bus_volt"] = round(bus_volt * 0.1, 1)
-        
-        dc_fault_val = decoder.decode_16bit_uint()
-        self.data["dc_fault_val"] = round(dc_fault_val * 0.1, 1)
-        
-        overload_fault_val = decoder.decode_16bit_uint()
-        self.data["overload_fault_val"] = overload_fault_val
-        
-        battery_volt_fault_val = decoder.decode_16bit_uint()
-        self.data["battery_volt_fault_val"] = round(battery_volt_fault_val * 0.1, 1)
-        
-        grid_voltage_r = decoder.decode_16bit_uint()
-        self.data["grid_voltage_r"] = round(grid_voltage_r * 0.1, 1)
-        
-        grid_current_r = decoder.decode_16bit_int()
-        self.data["grid_current_r"] = round(grid_current_r * 0.1, 1)
-        
-        # @todo Rename variable as it this is the invertor power on phase R, not the grid power.
-        #   The grid power is currently named as feedin_power_(rst)
-        #   (Measured Power), this quantity means what is Solax measuring via smart meter.
-        grid_power_r = decoder.decode_16bit_int()
-        self.data["grid_power_r"] = round(grid_power_r, 1)
-        
-        grid_frequency_r = decoder.decode_16bit_uint()
-        self.data["grid_frequency_r"] = round(grid_frequency_r * 0.01, 1)
-        
-        grid_voltage_s = decoder.decode_16bit_uint()
-        self.data["grid_voltage_s"] = round(grid_voltage_s * 0.1, 1)
-        
-        grid_current_s = decoder.decode_16bit_int()
-        self.data["grid_current_s"] = round(grid_current_s * 0.1, 1)
-        
-        # @todo Rename variable.
-        grid_power_s = decoder.decode_16bit_int()
-        self.data["grid_power_s"] = round(grid_power_s, 1)
-        
-        grid_frequency_s = decoder.decode_16bit_uint()
-        self.data["grid_frequency_s"] = round(grid_frequency_s * 0.01, 1)
-        
-        grid_voltage_t = decoder.decode_16bit_uint()
-        self.data["grid_voltage_t"] = round(grid_voltage_t * 0.1, 1)
-        
-        grid_current_t = decoder.decode_16bit_int()
-        self.data["grid_current_t"] = round(grid_current_t * 0.1, 1)
-        
-        # @todo Rename variable.
-        grid_power_t = decoder.decode_16bit_int()
-        self.data["grid_power_t"] = round(grid_power_t, 1)
-        
-        grid_frequency_t = decoder.decode_16bit_uint()
-        self.data["grid_frequency_t"] = round(grid_frequency_t * 0.01, 1)
-        
-        eps_voltage_r = decoder.decode_16bit_uint()
-        self.data["eps_voltage_r"] = round(eps_voltage_r * 0.1, 1)
-        
-        eps_current_r = decoder.decode_16bit_uint()
-        self.data["eps_current_r"] = round(eps_current_r * 0.1, 1)
-        
-        eps_power_active_r = decoder.decode_16bit_uint()
-        self.data["eps_power_active_r"] = eps_power_active_r
-        
-        eps_power_r = decoder.decode_16bit_uint()
-        self.data["eps_power_r"] = eps_power_r
-        
-        eps_voltage_s = decoder.decode_16bit_uint()
-        self.data["eps_voltage_s"] = round(eps_voltage_s * 0.1, 1)
-        
-        eps_current_s = decoder.decode_16bit_uint()
-        self.data["eps_current_s"] = round(eps_current_s * 0.1, 1)
-        
-        eps_power_active_s = decoder.decode_16bit_uint()
-        self.data["eps_power_active_s"] = eps_power_active_s
-        
-        eps_power_s = decoder.decode_16bit_uint()
-        self.data["eps_power_s"] = eps_power_s
-        
-        eps_voltage_t = decoder.decode_16bit_uint()
-        self.data["eps_voltage_t"] = round(eps_voltage_t * 0.1, 1)
-        
-        eps_current_t = decoder.decode_16bit_uint()
-        self.data["eps_current_t"] = round(eps_current_t * 0.1, 1)
-        
-        eps_power_active_t = decoder.decode_16bit_uint()
-        self.data["eps_power_active_t"] = eps_power_active_t
-        
-        eps_power_t = decoder.decode_16bit_uint()
-        self.data["eps_power_t"] = eps_power_t
-        
-        feedin_power_r = decoder.decode_16bit_int()
-        self.data["feedin_power_r"] = feedin_power_r
-        
-        decoder.skip_bytes(2)
-        
-        feedin_power_s = decoder.decode_16bit_int()
-        self.data["feedin_power_s"] = feedin_power_s
-        
-        decoder.skip_bytes(2)
-        
-        feedin_power_t = decoder.decode_16bit_int()
-        self.data["feedin_power_t"] = feedin_power_t
-        
-        decoder.skip_bytes(2)
-        
-        grid_mode_runtime = decoder.decode_16bit_int()
-        self.data["grid_mode_runtime"] = round(grid_mode_runtime * 0.1, 1)
-        
-        decoder.skip_bytes(2)
-        
-        eps_mode_runtime = decoder.decode_16bit_int()
-        self.data["eps_mode_runtime"] = round(eps_mode_runtime * 0.1, 1)
-        
-        decoder.skip_bytes(2)
-        
-        normal_runtime = decoder.decode_16bit_int()
-        self.data["normal_runtime"] = round(normal_runtime * 0.1, 1)
-        
-        decoder.skip_bytes(2)
-        
-        eps_yield_total = decoder.decode_16bit_uint()
-        self.data["eps_yield_total"] = round(eps_yield_total * 0.1, 1)
-        
-        decoder.skip_bytes(2)
-        
-        eps_yield_today = decoder.decode_16bit_uint()
-        self.data["eps_yield_today"] = round(eps_yield_today * 0.1, 1)
-        
-        e_charge_today = decoder.decode_16bit_uint()
-        self.data["e_charge_today"] = e_charge_today
-        
-        e_charge_total = decoder.decode_16bit_uint()
-        self.data["e_charge_total"] = e_charge_total
-        
-        decoder.skip_bytes(2)
-        
-        solar_energy_total = decoder.decode_16bit_uint()
-        self.data["solar_energy_total"] = round(solar_energy_total * 0.1, 1)
-        
-        decoder.skip_bytes(2)
-        
-        solar_energy_today = decoder.decode_16bit_uint()
-        self.data["solar_energy_today"] = round(solar_energy_today * 0.1, 1)
-        
-        decoder.skip_bytes(2)
-        
-        export_energy_today = decoder.decode_16bit_uint()
-        self.data["export_energy_today"] = round(export_energy_today * 0.01, 2)
-        
-        decoder.skip_bytes(2)
-        
-        import_energy_today = decoder.decode_16bit_uint()
-        self.data["import_energy_today"] = round(import_energy_today * 0.01, 2)
-        
-        return True
\ No newline at end of file
+        self._pipelined = False
+
+    def _update_derived_data(self, values):
+        """Recompute the derived values whose inputs changed in values."""
+        self._update_data(self._derived.update(values))
@@ -0,0 +1,106 @@
+"""Burst sampling of a few input registers between polls."""
+from dataclasses import replace
+
+from .const import (
+    GEN3_X1_SENSOR_TYPES,
+    GEN3_X3_SENSOR_TYPES,
+    REG_INPUT,
+    REGISTER_MAPS,
+    REGISTER_S16,
+    REGISTER_U16,
+    SENSOR_TYPES,
+    X1_EPS_SENSOR_TYPES,
+    X3_EPS_SENSOR_TYPES,
+)
+from .decoder import SolaXModbusBlockDecoder
+from .planner import plan_blocks
+
+BURST_STATISTICS = ("min", "max", "mean", "last")
+
+BURST_REGISTERS = {
+    register.key
+    for register in REGISTER_MAPS[REG_INPUT]
+    if register.unit in (REGISTER_U16, REGISTER_S16) and register.options is None
+}
+
+
+def parse_burst_keys(value):
+    """Return the keys of a comma separated list, checking each can be sampled."""
+    keys = [key.strip() for key in value.split(",") if key.strip()]
+    for key in keys:
+        if key not in BURST_REGISTERS:
+            raise ValueError(f"{key} is not a numeric input register")
+    return keys
+
+
+class SolaXModbusBurstSampler:
+    """Aggregate samples of a few input registers until they are published."""
+
+    def __init__(self, keys, max_gap, gen2=False):
+        """Plan the reads of keys."""
+        self.keys = keys
+        self.block_decoders = [
+            SolaXModbusBlockDecoder(block, REGISTER_MAPS[REG_INPUT], gen2)
+            for block in plan_blocks(keys, max_gap)
+        ]
+        self._samples = {}
+
+    def add(self, values):
+        """Aggregate the sampled keys of decoded values."""
+        samples = self._samples
+        for key in self.keys:
+            value = values.get(key)
+            if value is None:
+                continue
+            sample = samples.get(key)
+            if sample is None:
+                samples[key] = [value, value, value, 1, value]
+            else:
+                if value < sample[0]:
+                    sample[0] = value
+                if value > sample[1]:
+                    sample[1] = value
+                sample[2] += value
+                sample[3] += 1
+                sample[4] = value
+
+    def publish(self):
+        """Return the statistics of the samples since the last publish."""
+        samples, self._samples = self._samples, {}
+        values = {}
+        for key, (minimum, maximum, total, count, last) in samples.items():
+            values[f"{key}_min"] = minimum
+            values[f"{key}_max"] = maximum
+            values[f"{key}_mean"] = round(total / count, 2)
+            values[f"{key}_last"] = last
+        return values
+
+
+def burst_sensor_types(keys):
+    """Return the descriptions of the statistics sensors of keys."""
+    descriptions = {}
+    for sensor_types in (
+        SENSOR_TYPES,
+        GEN3_X1_SENSOR_TYPES,
+        GEN3_X3_SENSOR_TYPES,
+        X1_EPS_SENSOR_TYPES,
+        X3_EPS_SENSOR_TYPES,
+    ):
+        descriptions.update(sensor_types)
+
+    burst_types = {}
+    for key in keys:
+        description = descriptions.get(key)
+        if description is None:
+            continue
+        for statistic in BURST_STATISTICS:
+            burst_key = f"{key}_{statistic}"
+            burst_types[burst_key] = replace(
+                description,
+                key=burst_key,
+                name=f"{description.name} {statistic.capitalize()}",
+                deadband=None,
+                deadband_relative=None,
+                min_hold=None,
+            )
+    return burst_types
@@ -4,14 +4,47 @@ import re
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import (CONF_HOST, CONF_NAME, CONF_PORT,
-                                 CONF_SCAN_INTERVAL)
+                                 CONF_SCAN_INTERVAL, CONF_TYPE)
 from homeassistant.core import HomeAssistant, callback
 
+from .burst import parse_burst_keys
+from .connection import (
+    async_get_connection,
+    async_get_serial_connection,
+    async_release_connection,
+)
 from .const import (
+	CONNECTION_SERIAL,
+	CONNECTION_TCP,
+	DEFAULT_BAUDRATE,
+	DEFAULT_BURST_INTERVAL,
+	DEFAULT_BURST_KEYS,
 	DEFAULT_NAME,
+	DEFAULT_PARITY,
 	DEFAULT_PORT,
+	DEFAULT_UNIT_ID,
 	DEFAULT_SCAN_INTERVAL,
+	DEFAULT_SERIAL_PORT,
 	DOMAIN,
+	PARITIES,
+	CONF_ADAPTIVE_SCAN_INTERVAL,
+	CONF_BAUDRATE,
+	CONF_BURST_INTERVAL,
+	CONF_BURST_KEYS,
+	CONF_CONFIG_SCAN_INTERVAL,
+	CONF_MAX_READ_GAP,
+	CONF_MIN_SCAN_INTERVAL,
+	CONF_OFFLINE_CYCLES,
+	CONF_PARITY,
+	CONF_EPS_SCAN_INTERVAL,
+	CONF_IDLE_SCAN_INTERVAL,
+	CONF_INTEGRATE_ENERGY,
+	CONF_PIPELINED,
+	CONF_POLLING_PROFILES,
+	CONF_RECORD_REGISTERS,
+	CONF_SERIAL_PORT,
+	CONF_UNIT_ID,
+	CONF_VERIFY_WRITES,
 	CONF_READ_GEN2X1,
 	CONF_READ_GEN3X1,
 	CONF_READ_GEN3X3,
@@ -22,6 +55,27 @@ from .const import (
 	DEFAULT_READ_GEN3X3,
 	DEFAULT_READ_X1_EPS,
 	DEFAULT_READ_X3_EPS,
+	DEFAULT_CONFIG_SCAN_INTERVAL,
+	DEFAULT_MAX_READ_GAP,
+	DEFAULT_MIN_SCAN_INTERVAL,
+	DEFAULT_OFFLINE_CYCLES,
+	DEFAULT_ADAPTIVE_SCAN_INTERVAL,
+	DEFAULT_EPS_SCAN_INTERVAL,
+	DEFAULT_IDLE_SCAN_INTERVAL,
+	DEFAULT_INTEGRATE_ENERGY,
+	DEFAULT_PIPELINED,
+	DEFAULT_POLLING_PROFILES,
+	DEFAULT_RECORD_REGISTERS,
+	DEFAULT_VERIFY_WRITES,
+)
+from .detect import async_detect_inverter
+
+TYPE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_TYPE, default=CONNECTION_TCP): vol.In(
+            [CONNECTION_TCP, CONNECTION_SERIAL]
+        ),
+    }
 )
 
 DATA_SCHEMA = vol.Schema(
@@ -29,16 +83,65 @@ DATA_SCHEMA = vol.Schema(
         vol.Optional(CONF_NAME, default=DEFAULT_NAME): str,
         vol.Required(CONF_HOST): str,
         vol.Required(CONF_PORT, default=DEFAULT_PORT): int,
-        vol.Optional(CONF_READ_GEN2X1, default=DEFAULT_READ_GEN2X1): bool,
-        vol.Optional(CONF_READ_GEN3X1, default=DEFAULT_READ_GEN3X1): bool,
-        vol.Optional(CONF_READ_GEN3X3, default=DEFAULT_READ_GEN3X3): bool,
-        vol.Optional(CONF_READ_X1_EPS, default=DEFAULT_READ_X1_EPS): bool,
-        vol.Optional(CONF_READ_X3_EPS, default=DEFAULT_READ_X3_EPS): bool,
-        vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
+        vol.Optional(CONF_UNIT_ID, default=DEFAULT_UNIT_ID): int,
+    }
+)
+
+SERIAL_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NAME, default=DEFAULT_NAME): str,
+        vol.Required(CONF_SERIAL_PORT, default=DEFAULT_SERIAL_PORT): str,
+        vol.Required(CONF_BAUDRATE, default=DEFAULT_BAUDRATE): int,
+        vol.Required(CONF_PARITY, default=DEFAULT_PARITY): vol.In(PARITIES),
+        vol.Optional(CONF_UNIT_ID, default=DEFAULT_UNIT_ID): int,
     }
 )
 
 
+def options_schema(detected, pipelined):
+    """Return the schema of the polling options, defaulting to detected ones.
+
+    Pipelining is only offered on Modbus TCP.
+    """
+    defaults = {
+        CONF_READ_GEN2X1: DEFAULT_READ_GEN2X1,
+        CONF_READ_GEN3X1: DEFAULT_READ_GEN3X1,
+        CONF_READ_GEN3X3: DEFAULT_READ_GEN3X3,
+        CONF_READ_X1_EPS: DEFAULT_READ_X1_EPS,
+        CONF_READ_X3_EPS: DEFAULT_READ_X3_EPS,
+        CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
+        **detected,
+    }
+    schema = {
+        vol.Optional(CONF_READ_GEN2X1, default=defaults[CONF_READ_GEN2X1]): bool,
+        vol.Optional(CONF_READ_GEN3X1, default=defaults[CONF_READ_GEN3X1]): bool,
+        vol.Optional(CONF_READ_GEN3X3, default=defaults[CONF_READ_GEN3X3]): bool,
+        vol.Optional(CONF_READ_X1_EPS, default=defaults[CONF_READ_X1_EPS]): bool,
+        vol.Optional(CONF_READ_X3_EPS, default=defaults[CONF_READ_X3_EPS]): bool,
+        vol.Optional(CONF_SCAN_INTERVAL, default=defaults[CONF_SCAN_INTERVAL]): int,
+        vol.Optional(CONF_ADAPTIVE_SCAN_INTERVAL, default=DEFAULT_ADAPTIVE_SCAN_INTERVAL): bool,
+        vol.Optional(CONF_MIN_SCAN_INTERVAL, default=DEFAULT_MIN_SCAN_INTERVAL): vol.Coerce(float),
+        vol.Optional(CONF_POLLING_PROFILES, default=DEFAULT_POLLING_PROFILES): bool,
+        vol.Optional(CONF_IDLE_SCAN_INTERVAL, default=DEFAULT_IDLE_SCAN_INTERVAL): int,
+        vol.Optional(CONF_EPS_SCAN_INTERVAL, default=DEFAULT_EPS_SCAN_INTERVAL): int,
+        vol.Optional(CONF_CONFIG_SCAN_INTERVAL, default=DEFAULT_CONFIG_SCAN_INTERVAL): int,
+        vol.Optional(CONF_MAX_READ_GAP, default=DEFAULT_MAX_READ_GAP): int,
+    }
+    if pipelined:
+        schema[vol.Optional(CONF_PIPELINED, default=DEFAULT_PIPELINED)] = bool
+    schema.update(
+        {
+            vol.Optional(CONF_VERIFY_WRITES, default=DEFAULT_VERIFY_WRITES): bool,
+            vol.Optional(CONF_RECORD_REGISTERS, default=DEFAULT_RECORD_REGISTERS): bool,
+            vol.Optional(CONF_BURST_KEYS, default=DEFAULT_BURST_KEYS): str,
+            vol.Optional(CONF_BURST_INTERVAL, default=DEFAULT_BURST_INTERVAL): vol.Coerce(float),
+            vol.Optional(CONF_INTEGRATE_ENERGY, default=DEFAULT_INTEGRATE_ENERGY): bool,
+            vol.Optional(CONF_OFFLINE_CYCLES, default=DEFAULT_OFFLINE_CYCLES): int,
+        }
+    )
+    return vol.Schema(schema)
+
+
 def host_valid(host):
     """Return True if hostname or IP address is valid."""
     try:
@@ -49,44 +152,161 @@ def host_valid(host):
         return all(x and not disallowed.search(x) for x in host.split("."))
 
 
+def burst_keys_valid(burst_keys):
+    """Return True if every burst key is a numeric input register."""
+    try:
+        parse_burst_keys(burst_keys)
+    except ValueError:
+        return False
+    return True
+
+
 @callback
 def solax_modbus_entries(hass: HomeAssistant):
-    """Return the hosts already configured."""
+    """Return the hosts or serial ports and unit ids already configured."""
+    return set(
+        (
+            entry.data.get(CONF_HOST) or entry.data.get(CONF_SERIAL_PORT),
+            entry.data.get(CONF_UNIT_ID, DEFAULT_UNIT_ID),
+        )
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    )
+
+
+@callback
+def solax_modbus_names(hass: HomeAssistant):
+    """Return the names already configured."""
     return set(
-        entry.data[CONF_HOST] for entry in hass.config_entries.async_entries(DOMAIN)
+        entry.data.get(CONF_NAME) for entry in hass.config_entries.async_entries(DOMAIN)
     )
 
 
+def solax_modbus_unique_id(host, unit):
+    """Return the unique id of the inverter with unit id behind host or serial port."""
+    # Entries created before unit ids were configurable use the bare host.
+    if unit == DEFAULT_UNIT_ID:
+        return host
+    return f"{host}_{unit}"
+
+
 class SolaXModbusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """SolaX Modbus configflow."""
 
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
-    def _host_in_configuration_exists(self, host) -> bool:
-        """Return True if host exists in configuration."""
-        if host in solax_modbus_entries(self.hass):
+    def __init__(self):
+        """Start without connection data or detection."""
+        self._data = {}
+        self._detection = None
+
+    def _host_in_configuration_exists(self, host, unit) -> bool:
+        """Return True if the unit id behind host exists in configuration."""
+        if (host, unit) in solax_modbus_entries(self.hass):
             return True
         return False
 
     async def async_step_user(self, user_input=None):
-        """Handle the initial step."""
+        """Handle the initial step: choose Modbus TCP or RTU."""
+        if user_input is not None:
+            if user_input[CONF_TYPE] == CONNECTION_SERIAL:
+                return await self.async_step_serial()
+            return await self.async_step_tcp()
+
+        return self.async_show_form(step_id="user", data_schema=TYPE_SCHEMA)
+
+    async def async_step_tcp(self, user_input=None):
+        """Handle a Modbus TCP device."""
         errors = {}
 
         if user_input is not None:
             host = user_input[CONF_HOST]
+            unit = user_input[CONF_UNIT_ID]
 
-            if self._host_in_configuration_exists(host):
+            if self._host_in_configuration_exists(host, unit):
                 errors[CONF_HOST] = "already_configured"
+            elif user_input[CONF_NAME] in solax_modbus_names(self.hass):
+                errors[CONF_NAME] = "name_exists"
             elif not host_valid(user_input[CONF_HOST]):
                 errors[CONF_HOST] = "invalid host IP"
             else:
-                await self.async_set_unique_id(user_input[CONF_HOST])
+                await self.async_set_unique_id(solax_modbus_unique_id(host, unit))
                 self._abort_if_unique_id_configured()
+                self._data = {CONF_TYPE: CONNECTION_TCP, **user_input}
+                connection = async_get_connection(
+                    self.hass, host, user_input[CONF_PORT]
+                )
+                return await self._async_detect(connection, unit)
+
+        return self.async_show_form(
+            step_id="tcp", data_schema=DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_serial(self, user_input=None):
+        """Handle a Modbus RTU device on a serial port."""
+        errors = {}
+
+        if user_input is not None:
+            serial_port = user_input[CONF_SERIAL_PORT]
+            unit = user_input[CONF_UNIT_ID]
+
+            if self._host_in_configuration_exists(serial_port, unit):
+                errors[CONF_SERIAL_PORT] = "already_configured"
+            elif user_input[CONF_NAME] in solax_modbus_names(self.hass):
+                errors[CONF_NAME] = "name_exists"
+            else:
+                await self.async_set_unique_id(solax_modbus_unique_id(serial_port, unit))
+                self._abort_if_unique_id_configured()
+                self._data = {CONF_TYPE: CONNECTION_SERIAL, **user_input}
+                connection = async_get_serial_connection(
+                    self.hass,
+                    serial_port,
+                    user_input[CONF_BAUDRATE],
+                    user_input[CONF_PARITY],
+                )
+                return await self._async_detect(connection, unit)
+
+        return self.async_show_form(
+            step_id="serial", data_schema=SERIAL_DATA_SCHEMA, errors=errors
+        )
+
+    async def _async_detect(self, connection, unit):
+        """Detect the inverter behind connection, then ask for the options."""
+        try:
+            self._detection = await async_detect_inverter(connection, unit)
+        finally:
+            await async_release_connection(self.hass, connection)
+        return await self.async_step_options()
+
+    async def async_step_options(self, user_input=None):
+        """Handle the polling options, preset for the detected inverter."""
+        detection = self._detection
+        errors = {}
+
+        if user_input is not None:
+            if not burst_keys_valid(user_input[CONF_BURST_KEYS]):
+                errors[CONF_BURST_KEYS] = "invalid_burst_keys"
+            else:
                 return self.async_create_entry(
-                    title=user_input[CONF_NAME], data=user_input
+                    title=self._data[CONF_NAME], data={**self._data, **user_input}
                 )
+        elif detection is None:
+            errors["base"] = "cannot_detect"
 
+        if detection is None:
+            placeholders = {"model": "-", "seriesnumber": "-", "round_trip": "-"}
+        else:
+            placeholders = {
+                "model": detection.model,
+                "seriesnumber": detection.seriesnumber,
+                "round_trip": str(round(detection.round_trip * 1000)),
+            }
         return self.async_show_form(
-            step_id="user", data_schema=DATA_SCHEMA, errors=errors
+            step_id="options",
+            data_schema=options_schema(
+                detection.options if detection is not None else {},
+                self._data[CONF_TYPE] == CONNECTION_TCP,
+            ),
+            errors=errors,
+            description_placeholders=placeholders,
         )
@@ -0,0 +1,569 @@
+"""Modbus TCP and RTU connections with reconnect backoff and a circuit breaker."""
+import asyncio
+import logging
+import random
+import select
+import socket
+import time
+from functools import partial
+
+from homeassistant.core import callback
+from pymodbus.client.sync import ModbusSerialClient, ModbusTcpClient
+from pymodbus.constants import Defaults
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from pymodbus.register_read_message import (
+    ReadHoldingRegistersRequest,
+    ReadInputRegistersRequest,
+)
+from pymodbus.transaction import ModbusTransactionState
+
+from .const import (
+    CIRCUIT_BREAKER_THRESHOLD,
+    CIRCUIT_BREAKER_TIMEOUT,
+    DATA_CONNECTIONS,
+    DEFAULT_BAUDRATE,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_PARITY,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_UNIT_ID,
+    RECONNECT_BACKOFF_MAX,
+    RECONNECT_BACKOFF_MIN,
+    REG_HOLDING,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_DISCONNECTED = "disconnected"
+STATE_CONNECTED = "connected"
+STATE_BACKOFF = "backoff"
+STATE_OPEN = "open"
+
+
+class _TransportErrorMixin:
+    """Keep the socket or serial port error of the last transaction.
+
+    pymodbus turns every failed transaction into a ModbusIOException; the
+    kept error tells a broken transport apart from a unit that did not
+    answer.
+    """
+
+    transport_error = None
+
+    def _send(self, request):
+        try:
+            return super()._send(request)
+        except OSError as ex:
+            self.transport_error = ex
+            raise
+
+    def _recv(self, size):
+        try:
+            return super()._recv(size)
+        except OSError as ex:
+            self.transport_error = ex
+            raise
+
+
+class _TcpClient(_TransportErrorMixin, ModbusTcpClient):
+    """Modbus TCP client that notices the device closing the connection."""
+
+    def _recv(self, size):
+        data = super()._recv(size)
+        if not data and self.socket is not None and _peer_closed(self.socket):
+            self.transport_error = ConnectionResetError("Connection closed by the device")
+        return data
+
+
+class _SerialClient(_TransportErrorMixin, ModbusSerialClient):
+    """Modbus RTU client that keeps serial port errors."""
+
+
+def _peer_closed(sock):
+    """Return True if the other end closed the non-blocking socket sock."""
+    try:
+        return sock.recv(1, socket.MSG_PEEK) == b""
+    except BlockingIOError:
+        return False
+    except OSError:
+        return True
+
+
+def _backoff_delay(failures):
+    """Return the jittered delay before retrying after failures in a row."""
+    delay = min(RECONNECT_BACKOFF_MAX, RECONNECT_BACKOFF_MIN * 2 ** (failures - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def read_request(block, unit=DEFAULT_UNIT_ID):
+    """Return the pymodbus request that reads block."""
+    if block.register_type == REG_HOLDING:
+        return ReadHoldingRegistersRequest(block.address, block.count, unit=unit)
+    return ReadInputRegistersRequest(block.address, block.count, unit=unit)
+
+
+@callback
+def async_get_connection(hass, host, port):
+    """Return the shared connection to host:port, creating it on first use.
+
+    Gateways usually accept a single client, so every config entry behind
+    the same gateway shares one socket; each entry polls its own unit id.
+    """
+    return _async_get_shared(
+        hass, (host.lower(), int(port)), partial(SolaXModbusConnection, hass, host, int(port))
+    )
+
+
+@callback
+def async_get_serial_connection(hass, port, baudrate=DEFAULT_BAUDRATE, parity=DEFAULT_PARITY):
+    """Return the shared connection to the RS485 bus on a serial port."""
+    connection = _async_get_shared(
+        hass,
+        (port, None),
+        partial(SolaXModbusSerialConnection, hass, port, baudrate, parity),
+    )
+    if (connection.baudrate, connection.parity) != (baudrate, parity):
+        _LOGGER.warning(
+            "%s is already open at %s baud, parity %s; ignoring %s baud, parity %s",
+            port,
+            connection.baudrate,
+            connection.parity,
+            baudrate,
+            parity,
+        )
+    return connection
+
+
+@callback
+def _async_get_shared(hass, key, factory):
+    """Return the connection stored under key, creating it with factory."""
+    connections = hass.data.setdefault(DATA_CONNECTIONS, {})
+    connection = connections.get(key)
+    if connection is None:
+        connection = connections[key] = factory()
+    connection.users += 1
+    return connection
+
+
+async def async_release_connection(hass, connection):
+    """Release a connection; the last user closes it."""
+    connection.users -= 1
+    if connection.users > 0:
+        return
+    hass.data[DATA_CONNECTIONS].pop(connection.key, None)
+    await connection.async_close()
+
+
+class SolaXModbusConnection:
+    """Connection to one Modbus TCP device.
+
+    The pymodbus client is blocking, so every transaction is run in the
+    executor and serialized by an asyncio lock. Transport failures (a
+    failed connect, a reset or closed connection) move the connection into
+    backoff: no reconnect is attempted before an exponential, jittered delay
+    has passed. After CIRCUIT_BREAKER_THRESHOLD consecutive failures the
+    circuit opens and the device is left alone for CIRCUIT_BREAKER_TIMEOUT
+    seconds; one successful transaction closes it.
+
+    A unit that does not answer while the transport works only backs off
+    itself, with the same delays and its own circuit, so a sleeping
+    inverter behind a gateway does not stop the polls of the other units.
+
+    The lock hands out transactions in arrival order, which interleaves the
+    requests of all units sharing the connection.
+    """
+
+    # Bytes of a read request and of a read response besides its registers.
+    REQUEST_SIZE = 12
+    RESPONSE_OVERHEAD = 9
+
+    def __init__(
+        self,
+        hass,
+        host,
+        port,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+    ):
+        """Initialize the connection."""
+        self._hass = hass
+        self.host = host
+        self.port = port
+        self.users = 0
+        self._address = None
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._client = self._create_client()
+        self.lock = asyncio.Lock()
+        self.state = STATE_DISCONNECTED
+        self.connects = 0
+        self._failures = 0
+        self._retry_at = 0
+        self._unit_failures = {}
+        self._unit_retry_at = {}
+
+    def __str__(self):
+        """Return the address of the device."""
+        return f"{self.host}:{self.port}"
+
+    @property
+    def key(self):
+        """Return the key of this connection in the shared pool."""
+        return (self.host.lower(), self.port)
+
+    @property
+    def failures(self):
+        """Return the number of consecutive failed transactions."""
+        return self._failures
+
+    def unit_ready(self, unit):
+        """Return True if unit can be polled without connecting first."""
+        return (
+            self.state == STATE_CONNECTED
+            and time.monotonic() >= self._unit_retry_at.get(unit, 0)
+        )
+
+    async def async_ensure_connected(self, unit=None):
+        """Connect unless backing off; return True if the device can be polled.
+
+        With unit, also return False while that unit is backing off.
+        """
+        if unit is not None and time.monotonic() < self._unit_retry_at.get(unit, 0):
+            return False
+        if self._client.is_socket_open():
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        if not await self._async_resolve():
+            return False
+
+        connected = await self._async_run_locked(self._connect)
+        if not connected:
+            self._async_failed("connect failed")
+            return False
+
+        self.connects += 1
+        self.state = STATE_CONNECTED
+        return True
+
+    def _create_client(self):
+        """Return the pymodbus client of this connection."""
+        return _TcpClient(host=self.host, port=self.port, timeout=self._read_timeout)
+
+    async def _async_resolve(self):
+        """Resolve the host once; return False if it cannot be resolved."""
+        if self._address is not None:
+            return True
+        try:
+            infos = await self._hass.loop.getaddrinfo(
+                self.host, self.port, type=socket.SOCK_STREAM
+            )
+        except OSError as ex:
+            self._async_failed(f"cannot resolve {self.host}: {ex}")
+            return False
+        self._address = infos[0][4][0]
+        return True
+
+    def _connect(self):
+        """Connect the client with the connect timeout."""
+        client = self._client
+        client.host = self._address
+        client.timeout = self._connect_timeout
+        try:
+            return client.connect()
+        finally:
+            client.timeout = self._read_timeout
+
+    async def async_close(self):
+        """Disconnect client."""
+        # Not taken under the lock: closing the socket is what aborts a
+        # transaction still blocked in the executor.
+        await self._hass.async_add_executor_job(self._client.close)
+        if self.state == STATE_CONNECTED:
+            self.state = STATE_DISCONNECTED
+
+    async def _async_run_locked(self, func):
+        """Run a blocking client call in the executor, holding the lock.
+
+        Cancelling the caller does not stop the call in its thread, so the
+        lock is kept until the call has returned; the next transaction
+        would otherwise drive the client while it is still in use.
+        """
+        async with self.lock:
+            future = self._hass.async_add_executor_job(func)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                await asyncio.wait((future,))
+                raise
+
+    async def async_execute(self, unit, method, *args, **kwargs):
+        """Run one client call for unit and account for its outcome."""
+        if unit:
+            kwargs["unit"] = unit
+        try:
+            result, transport_error = await self._async_run_locked(
+                partial(self._execute, method, *args, **kwargs)
+            )
+        except ConnectionException as ex:
+            self._async_failed(str(ex))
+            raise
+
+        if transport_error is not None:
+            self._async_failed(str(transport_error))
+        elif isinstance(result, ModbusIOException):
+            self._async_unit_failed(unit, str(result))
+        else:
+            self._async_succeeded(unit)
+        return result
+
+    def _execute(self, method, *args, **kwargs):
+        """Run one client call; runs in the executor with the lock held.
+
+        Returns the result and the transport error of the call, if any.
+        """
+        client = self._client
+        client.transport_error = None
+        return getattr(client, method)(*args, **kwargs), client.transport_error
+
+    async def async_read_holding_registers(self, unit, address, count):
+        """Read holding registers."""
+        return await self.async_execute(unit, "read_holding_registers", address, count)
+
+    async def async_read_input_registers(self, unit, address, count):
+        """Read input registers."""
+        return await self.async_execute(unit, "read_input_registers", address, count)
+
+    async def async_execute_write(self, unit, method, *args, **kwargs):
+        """Run a write client call for unit, respecting the backoff.
+
+        Polls check async_ensure_connected before reading; writes are
+        checked here. Otherwise pymodbus would reconnect for every queued
+        write while the device is backing off or the breaker is open.
+        Raises ConnectionException if the write cannot be sent now.
+        """
+        if not await self.async_ensure_connected(unit):
+            raise ConnectionException(f"{self} is not reachable, not writing")
+        return await self.async_execute(unit, method, *args, **kwargs)
+
+    async def async_write_register(self, unit, address, payload):
+        """Write registers."""
+        return await self.async_execute_write(unit, "write_register", address, payload)
+
+    async def async_write_registers(self, unit, address, values):
+        """Write consecutive registers in one request."""
+        return await self.async_execute_write(unit, "write_registers", address, values)
+
+    async def async_readwrite_registers(self, unit, read_address, read_count, write_address, values):
+        """Write registers and read a range back in one request."""
+        return await self.async_execute_write(
+            unit,
+            "readwrite_registers",
+            read_address=read_address,
+            read_count=read_count,
+            write_address=write_address,
+            write_registers=values,
+        )
+
+    async def async_execute_pipelined(self, requests):
+        """Send requests back to back and account for them as one transaction.
+
+        Raises ConnectionException if the transport failed and
+        ModbusIOException if responses are missing.
+        """
+        unit = requests[0].unit_id
+        try:
+            responses = await self._async_run_locked(
+                partial(self._execute_pipelined, requests)
+            )
+        except ConnectionException as ex:
+            self._async_failed(str(ex))
+            raise
+        except ModbusIOException as ex:
+            self._async_unit_failed(unit, str(ex))
+            raise
+        self._async_succeeded(unit)
+        return responses
+
+    def _execute_pipelined(self, requests):
+        """Send all requests back to back and match responses by transaction id.
+
+        Runs in the executor with the lock held. Missing responses close the
+        socket, so late ones cannot be taken for the answers to later
+        requests.
+        """
+        client = self._client
+        if not client.connect():
+            raise ConnectionException(f"Failed to connect[{client}]")
+
+        packets = []
+        for request in requests:
+            request.transaction_id = client.transaction.getNextTID()
+            packets.append(client.framer.buildPacket(request))
+
+        responses = {}
+
+        def _collect(response):
+            responses[response.transaction_id] = response
+
+        deadline = time.monotonic() + client.timeout
+        try:
+            client.socket.settimeout(client.timeout)
+            client.socket.sendall(b"".join(packets))
+            while any(request.transaction_id not in responses for request in requests):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    client.close()
+                    raise ModbusIOException(
+                        f"{len(requests) - len(responses)} of {len(requests)} "
+                        "pipelined responses missing"
+                    )
+                readable, _, _ = select.select([client.socket], [], [], remaining)
+                if not readable:
+                    continue
+                data = client.socket.recv(1024)
+                if not data:
+                    raise ConnectionException("Connection closed during pipelined read")
+                client.framer.processIncomingPacket(data, _collect, unit=requests[0].unit_id)
+        except OSError as ex:
+            client.framer.resetFrame()
+            raise ConnectionException(str(ex)) from ex
+        except (ConnectionException, ModbusIOException):
+            client.framer.resetFrame()
+            raise
+
+        return [responses[request.transaction_id] for request in requests]
+
+    def _async_succeeded(self, unit):
+        """Reset the backoff of the connection and unit after a success."""
+        if self._failures >= CIRCUIT_BREAKER_THRESHOLD:
+            _LOGGER.info("Connection to %s restored", self)
+        self._failures = 0
+        self._retry_at = 0
+        self.state = STATE_CONNECTED
+        if self._unit_failures.pop(unit, 0) >= CIRCUIT_BREAKER_THRESHOLD:
+            _LOGGER.info("Unit %s on %s is responding again", unit, self)
+        self._unit_retry_at.pop(unit, None)
+
+    def _async_unit_failed(self, unit, reason):
+        """Schedule the next transaction of a unit that did not answer."""
+        failures = self._unit_failures[unit] = self._unit_failures.get(unit, 0) + 1
+        if failures >= CIRCUIT_BREAKER_THRESHOLD:
+            if failures == CIRCUIT_BREAKER_THRESHOLD:
+                _LOGGER.warning(
+                    "Unit %s on %s is not responding (%s), pausing its polling for %d s",
+                    unit,
+                    self,
+                    reason,
+                    CIRCUIT_BREAKER_TIMEOUT,
+                )
+            self._unit_retry_at[unit] = time.monotonic() + CIRCUIT_BREAKER_TIMEOUT
+            return
+
+        delay = _backoff_delay(failures)
+        log = _LOGGER.warning if failures == 1 else _LOGGER.debug
+        log("Unit %s on %s did not answer (%s), retry in %.1f s", unit, self, reason, delay)
+        self._unit_retry_at[unit] = time.monotonic() + delay
+
+    def _async_failed(self, reason):
+        """Close the socket and schedule the next connection attempt."""
+        self._client.close()
+        self._failures += 1
+
+        if self._failures >= CIRCUIT_BREAKER_THRESHOLD:
+            if self.state != STATE_OPEN:
+                _LOGGER.warning(
+                    "%s is not responding (%s), pausing polling for %d s",
+                    self,
+                    reason,
+                    CIRCUIT_BREAKER_TIMEOUT,
+                )
+            self.state = STATE_OPEN
+            # The address may have changed while the device was away.
+            self._address = None
+            self._retry_at = time.monotonic() + CIRCUIT_BREAKER_TIMEOUT
+            return
+
+        delay = _backoff_delay(self._failures)
+        log = _LOGGER.warning if self.state == STATE_CONNECTED else _LOGGER.debug
+        log("Modbus transaction with %s failed (%s), retry in %.1f s", self, reason, delay)
+        self.state = STATE_BACKOFF
+        self._retry_at = time.monotonic() + delay
+
+
+class SolaXModbusSerialConnection(SolaXModbusConnection):
+    """Connection to the Modbus RTU devices on one RS485 bus.
+
+    pymodbus measures the RTU silent interval (3.5 characters of 11 bits,
+    fixed at 1.75 ms above 19200 baud) but its framer sleeps the full
+    interval before every frame. Each transaction here instead waits only
+    for what is left of the interval since the end of the previous frame,
+    so requests follow each other at the fastest rate the bus allows.
+    RTU has no transaction ids, so requests cannot be pipelined.
+    """
+
+    REQUEST_SIZE = 8
+    RESPONSE_OVERHEAD = 5
+
+    def __init__(
+        self,
+        hass,
+        port,
+        baudrate=DEFAULT_BAUDRATE,
+        parity=DEFAULT_PARITY,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+    ):
+        """Initialize the connection."""
+        self.baudrate = baudrate
+        self.parity = parity
+        super().__init__(hass, port, None, read_timeout=read_timeout)
+
+    def __str__(self):
+        """Return the serial port of the bus."""
+        return f"{self.host} ({self.baudrate} baud)"
+
+    @property
+    def key(self):
+        """Return the key of this connection in the shared pool."""
+        return (self.host, None)
+
+    def _create_client(self):
+        """Return the pymodbus client of this connection."""
+        return _SerialClient(
+            method="rtu",
+            port=self.host,
+            baudrate=self.baudrate,
+            parity=self.parity,
+            stopbits=Defaults.Stopbits,
+            bytesize=Defaults.Bytesize,
+            timeout=self._read_timeout,
+        )
+
+    async def _async_resolve(self):
+        """Serial ports need no resolving."""
+        return True
+
+    def _connect(self):
+        """Open the serial port."""
+        return self._client.connect()
+
+    def _execute(self, method, *args, **kwargs):
+        """Wait for the bus to be idle, then run one client call."""
+        client = self._client
+        if client.last_frame_end is None:
+            # The port was just opened, or reopened after a failed
+            # transaction: a late response may still be on the bus, so
+            # wait the full interval like the framer does.
+            time.sleep(client.silent_interval)
+        else:
+            # last_frame_end is wall clock time, set by the framer.
+            delay = client.last_frame_end + client.silent_interval - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        # The silent interval has passed, skip the framer's own wait.
+        client.state = ModbusTransactionState.IDLE
+        client.transport_error = None
+        return getattr(client, method)(*args, **kwargs), client.transport_error
+
+    async def async_execute_pipelined(self, requests):
+        """Refuse: RTU responses cannot be matched to their requests."""
+        raise ModbusIOException("Modbus RTU does not support pipelined requests")
@@ -13,6 +13,7 @@ from homeassistant.const import (
     DEVICE_CLASS_POWER,
     DEVICE_CLASS_TEMPERATURE,
     DEVICE_CLASS_VOLTAGE,
+    ENTITY_CATEGORY_DIAGNOSTIC,
     ELECTRIC_CURRENT_AMPERE,
     ELECTRIC_CURRENT_MILLIAMPERE,
     ELECTRIC_POTENTIAL_VOLT,
@@ -23,12 +24,77 @@ from homeassistant.const import (
     POWER_WATT,
     TEMP_CELSIUS,
     TIME_HOURS,
+    TIME_SECONDS,
 )
 
 DOMAIN = "solax_modbus"
 DEFAULT_NAME = "SolaX"
 DEFAULT_SCAN_INTERVAL = 2
 DEFAULT_PORT = 502
+CONF_UNIT_ID = "unit_id"
+DEFAULT_UNIT_ID = 1
+DATA_CONNECTIONS = f"{DOMAIN}_connections"
+CONNECTION_TCP = "tcp"
+CONNECTION_SERIAL = "serial"
+CONF_SERIAL_PORT = "serial_port"
+CONF_BAUDRATE = "baudrate"
+CONF_PARITY = "parity"
+DEFAULT_SERIAL_PORT = "/dev/ttyUSB0"
+DEFAULT_BAUDRATE = 9600
+DEFAULT_PARITY = "N"
+PARITIES = ["N", "E", "O"]
+CONF_ADAPTIVE_SCAN_INTERVAL = "adaptive_scan_interval"
+DEFAULT_ADAPTIVE_SCAN_INTERVAL = False
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+DEFAULT_MIN_SCAN_INTERVAL = 1
+ADAPTIVE_SCAN_INTERVAL_MAX = 60
+ADAPTIVE_SCAN_HEADROOM = 2
+CONF_POLLING_PROFILES = "polling_profiles"
+DEFAULT_POLLING_PROFILES = False
+CONF_IDLE_SCAN_INTERVAL = "idle_scan_interval"
+DEFAULT_IDLE_SCAN_INTERVAL = 30
+CONF_EPS_SCAN_INTERVAL = "eps_scan_interval"
+DEFAULT_EPS_SCAN_INTERVAL = 1
+PROFILE_NORMAL = "normal"
+PROFILE_IDLE = "idle"
+PROFILE_EPS = "eps"
+IDLE_RUN_MODES = ("Waiting", "Off Mode", "Idle Mode")
+EPS_RUN_MODES = ("EPS Check Mode", "EPS Mode")
+PROFILE_KEYS = ("run_mode", "pv_total_power")
+CONF_CONFIG_SCAN_INTERVAL = "config_scan_interval"
+DEFAULT_CONFIG_SCAN_INTERVAL = 60
+CONF_MAX_READ_GAP = "max_read_gap"
+DEFAULT_MAX_READ_GAP = 32
+MAX_READ_COUNT = 125
+CONF_PIPELINED = "pipelined"
+DEFAULT_PIPELINED = False
+# Pipelined polls in a row that must lose responses the serial reads of the
+# same poll then get, before pipelining is turned off.
+PIPELINE_FALLBACK_CYCLES = 3
+CONF_VERIFY_WRITES = "verify_writes"
+DEFAULT_VERIFY_WRITES = False
+CONF_RECORD_REGISTERS = "record_registers"
+DEFAULT_RECORD_REGISTERS = False
+RECORDER_SIZE = 4 * 1024 * 1024
+CONF_BURST_KEYS = "burst_keys"
+DEFAULT_BURST_KEYS = ""
+CONF_BURST_INTERVAL = "burst_interval"
+DEFAULT_BURST_INTERVAL = 0.5
+CONF_INTEGRATE_ENERGY = "integrate_energy"
+DEFAULT_INTEGRATE_ENERGY = False
+CONF_OFFLINE_CYCLES = "offline_cycles"
+DEFAULT_OFFLINE_CYCLES = 3
+DEFAULT_CONNECT_TIMEOUT = 3
+DEFAULT_READ_TIMEOUT = 5
+RECONNECT_BACKOFF_MIN = 2
+RECONNECT_BACKOFF_MAX = 120
+CIRCUIT_BREAKER_THRESHOLD = 8
+CIRCUIT_BREAKER_TIMEOUT = 300
+WRITE_DEBOUNCE = 0.5
+MAX_WRITE_COUNT = 123
+SERVICE_PROFILE = "profile"
+ATTR_CYCLES = "cycles"
+DEFAULT_PROFILE_CYCLES = 10
 CONF_READ_GEN2X1 = "read_gen2_x1"
 CONF_READ_GEN3X1 = "read_gen3_x1"
 CONF_READ_GEN3X3 = "read_gen3_x3"
@@ -151,7 +217,17 @@ SELECT_TYPES = [
 
 @dataclass
 class SolaXModbusSensorEntityDescription(SensorEntityDescription):
-    """A class that describes SolaX Power Modbus sensor entities."""
+    """A class that describes SolaX Power Modbus sensor entities.
+
+    A new value is only published when it differs from the last published
+    one by at least ``deadband`` (absolute) and ``deadband_relative`` (as a
+    fraction of the published value), and not sooner than ``min_hold``
+    seconds after the previous publish.
+    """
+
+    deadband: float = None
+    deadband_relative: float = None
+    min_hold: float = None
 
 SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {  
     "allow_grid_charge": SolaXModbusSensorEntityDescription(
@@ -259,6 +335,7 @@ SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
 		native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
         device_class=DEVICE_CLASS_VOLTAGE,
         entity_registry_enabled_default=False,
+        deadband=1.0,
     ),
     "charger_start_time_1": SolaXModbusSensorEntityDescription(
     	name="Start Time 1",
@@ -344,6 +421,7 @@ SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
     	name="Inverter Frequency",
     	key="grid_frequency",
     	native_unit_of_measurement=FREQUENCY_HERTZ,
+        deadband=0.05,
     ),
     "grid_import": SolaXModbusSensorEntityDescription(
     	name="Grid Import",
@@ -371,6 +449,7 @@ SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
     	key="inverter_voltage",
     	native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
         device_class=DEVICE_CLASS_VOLTAGE,
+        deadband=1.0,
     ),
     "inverter_current": SolaXModbusSensorEntityDescription(
     	name="Inverter Current",
@@ -454,12 +533,14 @@ SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
     	key="pv_voltage_1",
     	native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
         device_class=DEVICE_CLASS_VOLTAGE,
+        deadband=1.0,
     ),
     "pv_voltage_2": SolaXModbusSensorEntityDescription(
     	name="PV Voltage 2",
     	key="pv_voltage_2",
     	native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
         device_class=DEVICE_CLASS_VOLTAGE,
+        deadband=1.0,
     ),
     "pv_total_power": SolaXModbusSensorEntityDescription(
     	name="PV Total Power",
@@ -520,6 +601,22 @@ SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
     ),
 }
 
+DIAGNOSTIC_SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
+    "effective_scan_interval": SolaXModbusSensorEntityDescription(
+        name="Scan Interval",
+        key="effective_scan_interval",
+        native_unit_of_measurement=TIME_SECONDS,
+        icon="mdi:timer-outline",
+        entity_category=ENTITY_CATEGORY_DIAGNOSTIC,
+    ),
+    "polling_profile": SolaXModbusSensorEntityDescription(
+        name="Polling Profile",
+        key="polling_profile",
+        icon="mdi:speedometer",
+        entity_category=ENTITY_CATEGORY_DIAGNOSTIC,
+    ),
+}
+
 GEN3_X1_SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
 	"backup_charge_end": SolaXModbusSensorEntityDescription(
 		name="Backup Charge End",
@@ -790,6 +887,13 @@ GEN3_X3_SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
         icon="mdi:solar-power",
         device_class=DEVICE_CLASS_ENERGY,
         state_class=STATE_CLASS_TOTAL_INCREASING,
+    ),
+	"feedin_power_total": SolaXModbusSensorEntityDescription(
+		name="Measured Power Total",
+		key="feedin_power_total",
+		native_unit_of_measurement=POWER_WATT,
+        device_class=DEVICE_CLASS_POWER,
+        state_class=STATE_CLASS_MEASUREMENT,
     ),
 	"feedin_power_r": SolaXModbusSensorEntityDescription(
 		name="Measured Power R",
@@ -855,6 +959,20 @@ GEN3_X3_SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
 		native_unit_of_measurement=POWER_WATT,
         device_class=DEVICE_CLASS_POWER,
         state_class=STATE_CLASS_MEASUREMENT,
+    ),
+	"grid_power_total": SolaXModbusSensorEntityDescription(
+		name="Inverter Power Total",
+		key="grid_power_total",
+		native_unit_of_measurement=POWER_WATT,
+        device_class=DEVICE_CLASS_POWER,
+        state_class=STATE_CLASS_MEASUREMENT,
+    ),
+	"grid_power_imbalance": SolaXModbusSensorEntityDescription(
+		name="Inverter Power Imbalance",
+		key="grid_power_imbalance",
+		native_unit_of_measurement=POWER_WATT,
+        device_class=DEVICE_CLASS_POWER,
+        state_class=STATE_CLASS_MEASUREMENT,
     ),
     "grid_service_x3": SolaXModbusSensorEntityDescription(
 		name="Grid Service X3",
@@ -890,4 +1008,257 @@ GEN3_X3_SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
 		name="Phase Power Balance X3",
 		key="phase_power_balance_x3",
 	),
-}
\ No newline at end of file
+}
+REG_HOLDING = "holding"
+REG_INPUT = "input"
+
+REGISTER_U16 = "uint16"
+REGISTER_S16 = "int16"
+REGISTER_STR = "string"
+REGISTER_TIME = "time"  # two registers: hours, minutes
+REGISTER_RTC = "rtc"  # six registers: seconds, minutes, hours, day, month, year
+
+POLL_IDENTITY = "identity"  # read once per connection
+POLL_CONFIG = "config"  # read every config_scan_interval and after writes
+POLL_REALTIME = "realtime"  # read every scan_interval
+
+
+@dataclass
+class SolaXModbusBlock:
+    """A class that describes a range of registers read in one request."""
+
+    register_type: str
+    address: int
+    count: int
+    tier: str = POLL_REALTIME
+
+
+@dataclass
+class SolaXModbusRegister:
+    """A class that describes how one SolaX Power Modbus value is decoded."""
+
+    key: str
+    address: int
+    unit: str = REGISTER_U16
+    length: int = 1
+    scale: float = 1
+    scale_gen2: float = None
+    precision: int = 1
+    options: dict = None
+
+
+# The regions reads are planned in, the fixed reads of earlier versions.
+# The last register of holding 0x7D and of input 0x0 and 0x66 is not
+# mapped, so with every entity enabled the planned reads of those regions
+# are one register shorter.
+REGISTER_BLOCKS = [
+    SolaXModbusBlock(REG_HOLDING, 0x0, 21, POLL_IDENTITY),
+    SolaXModbusBlock(REG_HOLDING, 0x7D, 64, POLL_CONFIG),
+    SolaXModbusBlock(REG_HOLDING, 0xFD, 25, POLL_CONFIG),
+    SolaXModbusBlock(REG_INPUT, 0x0, 86),
+    SolaXModbusBlock(REG_INPUT, 0x66, 54),
+]
+
+DISABLED_ENABLED = {
+    0: "Disabled",
+    1: "Enabled",
+}
+
+HOLDING_REGISTER_MAP = [
+    SolaXModbusRegister("seriesnumber", 0x0, REGISTER_STR, length=7),
+    SolaXModbusRegister("factoryname", 0x7, REGISTER_STR, length=7),
+    SolaXModbusRegister("modulename", 0xE, REGISTER_STR, length=7),
+    SolaXModbusRegister("firmwareversion_invertermaster", 0x7D),
+    SolaXModbusRegister("firmwareversion_modbustcp_major", 0x81),
+    SolaXModbusRegister("firmwareversion_modbustcp_minor", 0x82),
+    SolaXModbusRegister("firmwareversion_manager", 0x83),
+    SolaXModbusRegister("myaddress", 0x84),
+    SolaXModbusRegister("rtc", 0x85, REGISTER_RTC),
+    SolaXModbusRegister(
+        "charger_use_mode",
+        0x8B,
+        options={
+            0: "Self Use Mode",
+            1: "Force Time Use",
+            2: "Back Up Mode",
+            3: "Feedin Priority",
+        },
+    ),
+    SolaXModbusRegister("battery_min_capacity", 0x8C),
+    SolaXModbusRegister("battery_type", 0x8D, options={0: "Lead Acid", 1: "Lithium"}),
+    SolaXModbusRegister("battery_charge_float_voltage", 0x8E, scale=0.1),
+    SolaXModbusRegister("battery_discharge_cut_off_voltage", 0x8F, scale=0.1),
+    SolaXModbusRegister("battery_charge_max_current", 0x90, scale=0.1, scale_gen2=0.01),
+    SolaXModbusRegister("battery_discharge_max_current", 0x91, scale=0.1, scale_gen2=0.01),
+    SolaXModbusRegister("charger_start_time_1", 0x92, REGISTER_TIME),
+    SolaXModbusRegister("charger_end_time_1", 0x94, REGISTER_TIME),
+    SolaXModbusRegister("charger_start_time_2", 0x9A, REGISTER_TIME),
+    SolaXModbusRegister("charger_end_time_2", 0x9C, REGISTER_TIME),
+    SolaXModbusRegister("registration_code", 0xAF, REGISTER_STR, length=5),
+    SolaXModbusRegister(
+        "allow_grid_charge",
+        0xB4,
+        options={
+            0: "Forbidden",
+            1: "Charger Time 1",
+            2: "Charger Time 2",
+            3: "Both Charger Time's",
+        },
+    ),
+    SolaXModbusRegister("export_control_factory_limit", 0xB5, scale=0.1),
+    SolaXModbusRegister("export_control_user_limit", 0xB6, scale=0.1),
+    SolaXModbusRegister("eps_mute", 0xB7, options={0: "Off", 1: "On"}),
+    SolaXModbusRegister("eps_set_frequency", 0xB8, options={0: "50Hz", 1: "60Hz"}),
+    SolaXModbusRegister("inverter_rate_power", 0xBA),
+    SolaXModbusRegister(
+        "language",
+        0xBB,
+        options={
+            0: "English",
+            1: "Deutsche",
+            2: "Francais",
+            3: "Polskie",
+        },
+    ),
+    SolaXModbusRegister("backup_gridcharge", 0xFD, options=DISABLED_ENABLED),
+    SolaXModbusRegister("backup_charge_start", 0xFE, REGISTER_TIME),
+    SolaXModbusRegister("backup_charge_end", 0x100, REGISTER_TIME),
+    SolaXModbusRegister("was4777_power_manager", 0x102, options=DISABLED_ENABLED),
+    SolaXModbusRegister("cloud_control", 0x103, options=DISABLED_ENABLED),
+    SolaXModbusRegister("global_mppt_function", 0x104, options=DISABLED_ENABLED),
+    SolaXModbusRegister("grid_service_x3", 0x105, options=DISABLED_ENABLED),
+    SolaXModbusRegister("phase_power_balance_x3", 0x106, options=DISABLED_ENABLED),
+    SolaXModbusRegister("machine_style", 0x107, options={0: "X-Hybrid", 1: "X-Retro Fit"}),
+    SolaXModbusRegister("meter_function", 0x108, options=DISABLED_ENABLED),
+    SolaXModbusRegister("meter_1_id", 0x109),
+    SolaXModbusRegister("meter_2_id", 0x10A),
+    SolaXModbusRegister("power_control_timeout", 0x10B),
+    SolaXModbusRegister("eps_auto_restart", 0x10C, options=DISABLED_ENABLED),
+    SolaXModbusRegister("eps_min_esc_voltage", 0x10D),
+    SolaXModbusRegister("eps_min_esc_soc", 0x10E),
+    SolaXModbusRegister("forcetime_period_1_max_capacity", 0x10F),
+    SolaXModbusRegister("forcetime_period_2_max_capacity", 0x110),
+    SolaXModbusRegister("disch_cut_off_point_different", 0x111, options=DISABLED_ENABLED),
+    SolaXModbusRegister("disch_cut_off_capacity_grid_mode", 0x112),
+    SolaXModbusRegister("disch_cut_off_voltage_grid_mode", 0x113, scale=0.1),
+    SolaXModbusRegister("earth_detect_x3", 0x114, options=DISABLED_ENABLED),
+    SolaXModbusRegister("ct_meter_setting", 0x115, options={0: "Meter", 1: "CT"}),
+]
+
+INPUT_REGISTER_MAP = [
+    SolaXModbusRegister("inverter_voltage", 0x0, scale=0.1),
+    SolaXModbusRegister("inverter_current", 0x1, REGISTER_S16, scale=0.1),
+    SolaXModbusRegister("inverter_load", 0x2, REGISTER_S16),
+    SolaXModbusRegister("pv_voltage_1", 0x3, scale=0.1),
+    SolaXModbusRegister("pv_voltage_2", 0x4, scale=0.1),
+    SolaXModbusRegister("pv_current_1", 0x5, scale=0.1),
+    SolaXModbusRegister("pv_current_2", 0x6, scale=0.1),
+    SolaXModbusRegister("grid_frequency", 0x7, scale=0.01, precision=2),
+    SolaXModbusRegister("inverter_temperature", 0x8, REGISTER_S16),
+    SolaXModbusRegister(
+        "run_mode",
+        0x9,
+        options={
+            0: "Waiting",
+            1: "Checking",
+            2: "Normal Mode",
+            3: "Off Mode",
+            4: "Permanent Fault Mode",
+            5: "Update Mode",
+            6: "EPS Check Mode",
+            7: "EPS Mode",
+            8: "Self Test",
+            9: "Idle Mode",
+        },
+    ),
+    SolaXModbusRegister("pv_power_1", 0xA),
+    SolaXModbusRegister("pv_power_2", 0xB),
+    SolaXModbusRegister("time_count_down", 0x13, scale=0.001, precision=0),
+    SolaXModbusRegister("battery_voltage_charge", 0x14, REGISTER_S16, scale=0.1, scale_gen2=0.01),
+    SolaXModbusRegister("battery_current_charge", 0x15, REGISTER_S16, scale=0.1, scale_gen2=0.01),
+    SolaXModbusRegister("battery_power_charge", 0x16, REGISTER_S16),
+    SolaXModbusRegister("bms_connect_state", 0x17, options={0: "Disconnected", 1: "Connected"}),
+    SolaXModbusRegister("battery_temperature", 0x18, REGISTER_S16),
+    SolaXModbusRegister("battery_capacity_charge", 0x1C),
+    SolaXModbusRegister("output_energy_charge_lsb", 0x1D, scale=0.1),
+    SolaXModbusRegister("output_energy_charge_msb", 0x1E, scale=0.1),
+    SolaXModbusRegister("bms_warning_lsb", 0x1F),
+    SolaXModbusRegister("output_energy_charge_today", 0x20, scale=0.1),
+    SolaXModbusRegister("input_energy_charge_lsb", 0x21, scale=0.1),
+    SolaXModbusRegister("input_energy_charge_msb", 0x22, scale=0.1),
+    SolaXModbusRegister("input_energy_charge_today", 0x23, scale=0.1),
+    SolaXModbusRegister("bms_charge_max_current", 0x24, scale=0.1),
+    SolaXModbusRegister("bms_discharge_max_current", 0x25, scale=0.1),
+    SolaXModbusRegister("bms_warning_msb", 0x26),
+    SolaXModbusRegister("feedin_power", 0x46, REGISTER_S16),
+    SolaXModbusRegister("feedin_energy_total", 0x47, scale=0.01),
+    SolaXModbusRegister("consumed_energy_total", 0x49, scale=0.01),
+    SolaXModbusRegister("eps_voltage", 0x4B, scale=0.1),
+    SolaXModbusRegister("eps_current", 0x4C, scale=0.1),
+    SolaXModbusRegister("eps_power", 0x4D),
+    SolaXModbusRegister("eps_frequency", 0x4F, scale=0.01, precision=2),
+    SolaXModbusRegister("energy_today", 0x50, scale=0.1),
+    SolaXModbusRegister("total_energy_to_grid", 0x52, scale=0.001),
+    SolaXModbusRegister("lock_state", 0x54, options={0: "Locked", 1: "Unlocked"}),
+    SolaXModbusRegister("bus_volt", 0x66, scale=0.1),
+    SolaXModbusRegister("dc_fault_val", 0x67, scale=0.1),
+    SolaXModbusRegister("overload_fault_val", 0x68),
+    SolaXModbusRegister("battery_volt_fault_val", 0x69, scale=0.1),
+    SolaXModbusRegister("grid_voltage_r", 0x6A, scale=0.1),
+    SolaXModbusRegister("grid_current_r", 0x6B, REGISTER_S16, scale=0.1),
+    # @todo Rename key as this is the invertor power on phase R, not the grid power.
+    #   The grid power is currently named as feedin_power_(rst)
+    #   (Measured Power), this quantity means what is Solax measuring via smart meter.
+    SolaXModbusRegister("grid_power_r", 0x6C, REGISTER_S16),
+    SolaXModbusRegister("grid_frequency_r", 0x6D, scale=0.01),
+    SolaXModbusRegister("grid_voltage_s", 0x6E, scale=0.1),
+    SolaXModbusRegister("grid_current_s", 0x6F, REGISTER_S16, scale=0.1),
+    SolaXModbusRegister("grid_power_s", 0x70, REGISTER_S16),
+    SolaXModbusRegister("grid_frequency_s", 0x71, scale=0.01),
+    SolaXModbusRegister("grid_voltage_t", 0x72, scale=0.1),
+    SolaXModbusRegister("grid_current_t", 0x73, REGISTER_S16, scale=0.1),
+    SolaXModbusRegister("grid_power_t", 0x74, REGISTER_S16),
+    SolaXModbusRegister("grid_frequency_t", 0x75, scale=0.01),
+    SolaXModbusRegister("eps_voltage_r", 0x76, scale=0.1),
+    SolaXModbusRegister("eps_current_r", 0x77, scale=0.1),
+    SolaXModbusRegister("eps_power_active_r", 0x78),
+    SolaXModbusRegister("eps_power_r", 0x79),
+    SolaXModbusRegister("eps_voltage_s", 0x7A, scale=0.1),
+    SolaXModbusRegister("eps_current_s", 0x7B, scale=0.1),
+    SolaXModbusRegister("eps_power_active_s", 0x7C),
+    SolaXModbusRegister("eps_power_s", 0x7D),
+    SolaXModbusRegister("eps_voltage_t", 0x7E, scale=0.1),
+    SolaXModbusRegister("eps_current_t", 0x7F, scale=0.1),
+    SolaXModbusRegister("eps_power_active_t", 0x80),
+    SolaXModbusRegister("eps_power_t", 0x81),
+    SolaXModbusRegister("feedin_power_r", 0x82, REGISTER_S16),
+    SolaXModbusRegister("feedin_power_s", 0x84, REGISTER_S16),
+    SolaXModbusRegister("feedin_power_t", 0x86, REGISTER_S16),
+    SolaXModbusRegister("grid_mode_runtime", 0x88, REGISTER_S16, scale=0.1),
+    SolaXModbusRegister("eps_mode_runtime", 0x8A, REGISTER_S16, scale=0.1),
+    SolaXModbusRegister("normal_runtime", 0x8C, REGISTER_S16, scale=0.1),
+    SolaXModbusRegister("eps_yield_total", 0x8E, scale=0.1),
+    SolaXModbusRegister("eps_yield_today", 0x90, scale=0.1),
+    SolaXModbusRegister("e_charge_today", 0x91),
+    SolaXModbusRegister("e_charge_total", 0x92),
+    SolaXModbusRegister("solar_energy_total", 0x94, scale=0.1),
+    SolaXModbusRegister("solar_energy_today", 0x96, scale=0.1),
+    SolaXModbusRegister("export_energy_today", 0x98, scale=0.01, precision=2),
+    SolaXModbusRegister("import_energy_today", 0x9A, scale=0.01, precision=2),
+]
+
+REGISTER_MAPS = {
+    REG_HOLDING: HOLDING_REGISTER_MAP,
+    REG_INPUT: INPUT_REGISTER_MAP,
+}
+
+# Holding register each writable register is read back from.
+WRITE_READBACK = {
+    0x1F: 0x8B,
+    0x20: 0x8C,
+    0x24: 0x90,
+    0x25: 0x91,
+    0x40: 0xB4,
+    0xA4: 0x10F,
+    0xA5: 0x110,
+}
@@ -0,0 +1,150 @@
+"""Table-driven decoding of SolaX Modbus register blocks."""
+from struct import Struct
+
+from .const import (
+    REGISTER_RTC,
+    REGISTER_S16,
+    REGISTER_STR,
+    REGISTER_TIME,
+    REGISTER_U16,
+)
+
+REGISTER_LENGTHS = {
+    REGISTER_U16: 1,
+    REGISTER_S16: 1,
+    REGISTER_TIME: 2,
+    REGISTER_RTC: 6,
+}
+
+# struct format of each register type, one character per unpacked field.
+FORMATS = {
+    REGISTER_U16: "H",
+    REGISTER_S16: "h",
+    REGISTER_TIME: "HH",
+    REGISTER_RTC: "HHHHHH",
+}
+
+# round(value * scale, precision) equals value / divisor for every 16 bit
+# value with these scales, and dividing is several times faster.
+DIVISORS = {
+    (0.1, 1): 10,
+    (0.01, 2): 100,
+    (0.001, 3): 1000,
+}
+
+
+def register_length(register):
+    """Return the number of 16 bit registers a value occupies."""
+    return REGISTER_LENGTHS.get(register.unit, register.length)
+
+
+def _format_time(values, index):
+    hours, minutes = values[index:index + 2]
+    return f"{hours}:{minutes}"
+
+
+def _format_rtc(values, index):
+    seconds, minutes, hours, days, months, years = values[index:index + 6]
+    return f"{hours}:{minutes}:{seconds} {days}/{months}/{years}"
+
+
+def _format_string(values, index):
+    return values[index].decode("ascii")
+
+
+FORMATTERS = {
+    REGISTER_TIME: _format_time,
+    REGISTER_RTC: _format_rtc,
+    REGISTER_STR: _format_string,
+}
+
+
+class SolaXModbusBlockDecoder:
+    """Decode plan for one block read, compiled once from the register map.
+
+    The registers of the map that fall inside the block are compiled into a
+    single struct format, with pad bytes for the registers in between, so a
+    response is unpacked in one call. The unpacked fields are then sorted
+    into plain, scaled, enumerated and formatted values by lookup tables.
+    """
+
+    def __init__(self, block, register_map, gen2=False):
+        """Compile the plan of ``block`` from ``register_map``."""
+        self.block = block
+        self._words = Struct(f">{block.count}H")
+        self._keys = []
+        self._plain_keys = []
+        self._plain_indexes = []
+        self._divided = []
+        self._scaled = []
+        self._options = []
+        self._formatted = []
+
+        end = block.address + block.count
+        position = block.address
+        formats = [">"]
+        index = 0
+        for register in sorted(register_map, key=lambda register: register.address):
+            length = register_length(register)
+            if register.address < block.address or register.address + length > end:
+                continue
+            if register.address < position:
+                raise ValueError(
+                    f"Register {register.key} at {register.address:#x} overlaps "
+                    f"the previous value in block {block.address:#x}"
+                )
+
+            if register.address > position:
+                formats.append(f"{(register.address - position) * 2}x")
+            if register.unit == REGISTER_STR:
+                formats.append(f"{length * 2}s")
+                fields = 1
+            else:
+                formats.append(FORMATS[register.unit])
+                fields = len(FORMATS[register.unit])
+
+            scale = register.scale
+            if gen2 and register.scale_gen2 is not None:
+                scale = register.scale_gen2
+
+            key = register.key
+            self._keys.append(key)
+            if register.unit in FORMATTERS:
+                self._formatted.append((key, index, FORMATTERS[register.unit]))
+            elif register.options is not None:
+                self._options.append((key, index, register.options))
+            elif (scale, register.precision) in DIVISORS:
+                self._divided.append((key, index, DIVISORS[scale, register.precision]))
+            elif scale != 1:
+                self._scaled.append((key, index, scale, register.precision))
+            else:
+                self._plain_keys.append(key)
+                self._plain_indexes.append(index)
+
+            index += fields
+            position = register.address + length
+
+        self._fields = Struct("".join(formats))
+
+    @property
+    def keys(self):
+        """Return the keys produced by this block."""
+        return list(self._keys)
+
+    def decode(self, registers):
+        """Decode a block response into a dict of values."""
+        values = self._fields.unpack_from(self._words.pack(*registers))
+
+        data = dict(
+            zip(self._plain_keys, [values[index] for index in self._plain_indexes])
+        )
+        for key, index, divisor in self._divided:
+            data[key] = values[index] / divisor
+        for key, index, scale, precision in self._scaled:
+            data[key] = round(values[index] * scale, precision)
+        for key, index, options in self._options:
+            data[key] = options.get(values[index], "Unknown")
+        for key, index, formatter in self._formatted:
+            data[key] = formatter(values, index)
+
+        return data
@@ -0,0 +1,154 @@
+"""Values the hub computes from other values instead of reading them.
+
+Every derived value is a DerivedMetric: a function of the values of its
+inputs, which may be registers or other derived values. DERIVED_METRICS is
+kept in dependency order, so one pass over it computes every metric from
+values of the same poll. SolaXModbusDerivedData only recomputes the
+metrics whose inputs changed.
+"""
+from dataclasses import dataclass
+from typing import Callable, Tuple
+
+
+@dataclass(frozen=True)
+class DerivedMetric:
+    """A value computed from the values of inputs."""
+
+    key: str
+    inputs: Tuple[str, ...]
+    compute: Callable
+
+
+def _sum(*values):
+    return sum(values)
+
+
+def _export(feedin_power):
+    return feedin_power if feedin_power > 0 else 0
+
+
+def _import(feedin_power):
+    return abs(feedin_power) if feedin_power < 0 else 0
+
+
+def _house_load(inverter_load, feedin_power):
+    return inverter_load - feedin_power
+
+
+def _imbalance(*values):
+    return max(values) - min(values)
+
+
+def _sort_metrics(metrics):
+    """Return metrics in dependency order; raise ValueError on a cycle."""
+    by_key = {metric.key: metric for metric in metrics}
+    ordered = []
+    state = {}
+
+    def visit(metric):
+        if state.get(metric.key) == "done":
+            return
+        if state.get(metric.key) == "visiting":
+            raise ValueError(f"Derived metric {metric.key} depends on itself")
+        state[metric.key] = "visiting"
+        for key in metric.inputs:
+            if key in by_key:
+                visit(by_key[key])
+        state[metric.key] = "done"
+        ordered.append(metric)
+
+    for metric in metrics:
+        visit(metric)
+    return ordered
+
+
+DERIVED_METRICS = _sort_metrics(
+    [
+        DerivedMetric("pv_total_power", ("pv_power_1", "pv_power_2"), _sum),
+        DerivedMetric("grid_export", ("feedin_power",), _export),
+        DerivedMetric("grid_import", ("feedin_power",), _import),
+        DerivedMetric("house_load", ("inverter_load", "feedin_power"), _house_load),
+        DerivedMetric(
+            "grid_power_total", ("grid_power_r", "grid_power_s", "grid_power_t"), _sum
+        ),
+        DerivedMetric(
+            "grid_power_imbalance",
+            ("grid_power_r", "grid_power_s", "grid_power_t"),
+            _imbalance,
+        ),
+        DerivedMetric(
+            "feedin_power_total",
+            ("feedin_power_r", "feedin_power_s", "feedin_power_t"),
+            _sum,
+        ),
+    ]
+)
+
+
+def _register_inputs(metric, metrics):
+    """Return the registers metric is computed from, through other metrics."""
+    registers = set()
+    for key in metric.inputs:
+        if key in metrics:
+            registers |= _register_inputs(metrics[key], metrics)
+        else:
+            registers.add(key)
+    return registers
+
+
+# The registers every derived value needs, for planning the reads.
+DERIVED_KEYS = {
+    metric.key: tuple(
+        sorted(
+            _register_inputs(metric, {metric.key: metric for metric in DERIVED_METRICS})
+        )
+    )
+    for metric in DERIVED_METRICS
+}
+
+_MISSING = object()
+
+
+def derive_values(data):
+    """Return every derived value computable from the values in data."""
+    values = dict(data)
+    derived = {}
+    for metric in DERIVED_METRICS:
+        try:
+            inputs = [values[key] for key in metric.inputs]
+        except KeyError:
+            continue
+        values[metric.key] = derived[metric.key] = metric.compute(*inputs)
+    return derived
+
+
+class SolaXModbusDerivedData:
+    """The derived values of one hub, recomputed when their inputs change."""
+
+    def __init__(self):
+        """Start without values."""
+        self.values = {}
+
+    def update(self, values):
+        """Take the values of one poll; return the derived values that changed."""
+        snapshot = self.values
+        changed = {
+            key for key, value in values.items() if snapshot.get(key, _MISSING) != value
+        }
+        snapshot.update(values)
+
+        derived = {}
+        if not changed:
+            return derived
+        for metric in DERIVED_METRICS:
+            if changed.isdisjoint(metric.inputs):
+                continue
+            try:
+                inputs = [snapshot[key] for key in metric.inputs]
+            except KeyError:
+                continue
+            value = metric.compute(*inputs)
+            if snapshot.get(metric.key, _MISSING) != value:
+                snapshot[metric.key] = derived[metric.key] = value
+                changed.add(metric.key)
+        return derived
@@ -0,0 +1,186 @@
+"""Detection of the inverter model behind a new connection.
+
+The serial number in the identity registers starts with a model prefix that
+selects the register map. Inverters with an unknown prefix are told apart
+by probing the grid voltage registers: Gen2 inverters do not have them and
+only three phase inverters report a voltage on phase S. A few reads of the
+realtime block measure the round trip, from which a scan interval the
+connection can sustain is suggested.
+"""
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import math
+import statistics
+import struct
+import time
+
+from homeassistant.const import CONF_SCAN_INTERVAL
+from pymodbus.exceptions import ModbusException
+from pymodbus.pdu import ExceptionResponse
+
+from .const import (
+    ADAPTIVE_SCAN_HEADROOM,
+    CONF_READ_GEN2X1,
+    CONF_READ_GEN3X1,
+    CONF_READ_GEN3X3,
+    CONF_READ_X1_EPS,
+    CONF_READ_X3_EPS,
+    DEFAULT_SCAN_INTERVAL,
+    REG_HOLDING,
+    REG_INPUT,
+    REGISTER_BLOCKS,
+    REGISTER_MAPS,
+    SolaXModbusBlock,
+)
+from .decoder import SolaXModbusBlockDecoder
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds the whole detection may take. A read still running when they are
+# up is waited for, so detection can take up to the read timeout longer.
+DETECT_TIMEOUT = 10
+# Reads of the realtime block timed for the round trip.
+DETECT_ROUND_TRIPS = 3
+
+MODEL_GEN2_X1 = "Gen2 X1"
+MODEL_GEN3_X1 = "Gen3 X1"
+MODEL_GEN3_X3 = "Gen3 X3"
+
+# The register map option of each model and its EPS option.
+MODELS = {
+    MODEL_GEN2_X1: (CONF_READ_GEN2X1, CONF_READ_X1_EPS),
+    MODEL_GEN3_X1: (CONF_READ_GEN3X1, CONF_READ_X1_EPS),
+    MODEL_GEN3_X3: (CONF_READ_GEN3X3, CONF_READ_X3_EPS),
+}
+
+# Serial number prefix, model and whether the inverter has an EPS output.
+SERIAL_PREFIXES = (
+    ("L30E", MODEL_GEN2_X1, False),
+    ("U30", MODEL_GEN2_X1, False),
+    ("L37E", MODEL_GEN2_X1, False),
+    ("L50E", MODEL_GEN2_X1, False),
+    ("H1E", MODEL_GEN3_X1, True),
+    ("HCC", MODEL_GEN3_X1, True),
+    ("HUE", MODEL_GEN3_X1, True),
+    ("XRE", MODEL_GEN3_X1, True),
+    ("H3DE", MODEL_GEN3_X3, True),
+    ("H3E", MODEL_GEN3_X3, True),
+    ("H3LE", MODEL_GEN3_X3, True),
+    ("H3PE", MODEL_GEN3_X3, True),
+    ("H3UE", MODEL_GEN3_X3, True),
+    ("F3E", MODEL_GEN3_X3, True),
+)
+
+IDENTITY_BLOCK = REGISTER_BLOCKS[0]
+REALTIME_BLOCK = REGISTER_BLOCKS[3]
+# grid_voltage_r to grid_voltage_s.
+GRID_VOLTAGE_BLOCK = SolaXModbusBlock(REG_INPUT, 0x6A, 5)
+
+
+@dataclass
+class SolaXModbusDetection:
+    """The model of an inverter and the options suggested for it."""
+
+    seriesnumber: str
+    model: str
+    round_trip: float
+    options: dict = field(default_factory=dict)
+
+
+def model_from_serial(seriesnumber):
+    """Return the model and EPS flag of a serial number, or None if unknown."""
+    for prefix, model, eps in SERIAL_PREFIXES:
+        if seriesnumber.startswith(prefix):
+            return model, eps
+    return None
+
+
+def suggest_scan_interval(round_trip, blocks):
+    """Return a scan interval in seconds for polls of blocks reads."""
+    return max(
+        DEFAULT_SCAN_INTERVAL, math.ceil(round_trip * blocks * ADAPTIVE_SCAN_HEADROOM)
+    )
+
+
+async def async_detect_inverter(connection, unit):
+    """Return the detection of the inverter with unit id, or None on failure."""
+    try:
+        return await asyncio.wait_for(
+            _async_detect(connection, unit), timeout=DETECT_TIMEOUT
+        )
+    except (
+        asyncio.TimeoutError,
+        ModbusException,
+        KeyError,
+        struct.error,
+        UnicodeDecodeError,
+    ) as ex:
+        # A noisy bus can garble a response into one that does not decode.
+        _LOGGER.debug("Cannot detect unit %s on %s: %s", unit, connection, ex)
+        return None
+
+
+async def _async_detect(connection, unit):
+    """Identify the inverter, probe it and time its round trip."""
+    if not await connection.async_ensure_connected(unit):
+        return None
+
+    response = await connection.async_read_holding_registers(
+        unit, IDENTITY_BLOCK.address, IDENTITY_BLOCK.count
+    )
+    if response.isError() or len(response.registers) != IDENTITY_BLOCK.count:
+        _LOGGER.debug("Cannot read the identity of unit %s on %s", unit, connection)
+        return None
+    identity = SolaXModbusBlockDecoder(
+        IDENTITY_BLOCK, REGISTER_MAPS[REG_HOLDING]
+    ).decode(response.registers)
+    seriesnumber = identity["seriesnumber"].strip("\x00 ")
+
+    known = model_from_serial(seriesnumber)
+    if known is not None:
+        model, eps = known
+    else:
+        model, eps = await _async_probe_model(connection, unit), False
+        if model is None:
+            return None
+
+    round_trips = []
+    for _ in range(DETECT_ROUND_TRIPS):
+        started = time.monotonic()
+        response = await connection.async_read_input_registers(
+            unit, REALTIME_BLOCK.address, REALTIME_BLOCK.count
+        )
+        if response.isError():
+            return None
+        round_trips.append(time.monotonic() - started)
+    round_trip = statistics.median(round_trips)
+
+    map_option, eps_option = MODELS[model]
+    options = {option: False for pair in MODELS.values() for option in pair}
+    options[map_option] = True
+    options[eps_option] = eps
+    # The realtime registers of Gen3 inverters take a second input block.
+    blocks = 1 if model == MODEL_GEN2_X1 else 2
+    options[CONF_SCAN_INTERVAL] = suggest_scan_interval(round_trip, blocks)
+    return SolaXModbusDetection(seriesnumber, model, round_trip, options)
+
+
+async def _async_probe_model(connection, unit):
+    """Return the model of an inverter with an unknown serial number.
+
+    Returns None if the probe failed without an answer of the inverter.
+    """
+    response = await connection.async_read_input_registers(
+        unit, GRID_VOLTAGE_BLOCK.address, GRID_VOLTAGE_BLOCK.count
+    )
+    if isinstance(response, ExceptionResponse):
+        return MODEL_GEN2_X1
+    if response.isError() or len(response.registers) != GRID_VOLTAGE_BLOCK.count:
+        return None
+    values = SolaXModbusBlockDecoder(
+        GRID_VOLTAGE_BLOCK, REGISTER_MAPS[REG_INPUT]
+    ).decode(response.registers)
+    if values.get("grid_voltage_s"):
+        return MODEL_GEN3_X3
+    return MODEL_GEN3_X1
@@ -0,0 +1,105 @@
+"""Energy totals integrated by the hub from the power it reads."""
+from homeassistant.components.sensor import STATE_CLASS_TOTAL_INCREASING
+from homeassistant.const import DEVICE_CLASS_ENERGY, ENERGY_KILO_WATT_HOUR
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SolaXModbusSensorEntityDescription
+
+STORAGE_VERSION = 1
+# Seconds from the first change of the totals to their save.
+SAVE_DELAY = 60
+# Samples further apart than this many seconds are not integrated: the power
+# in between is unknown, for example while the inverter was unreachable.
+MAX_SAMPLE_GAP = 300
+
+# Energy key, power key and the sign of the power that is integrated.
+ENERGY_SOURCES = (
+    ("pv_energy_integrated", "pv_total_power", 1),
+    ("grid_import_energy_integrated", "grid_import", 1),
+    ("grid_export_energy_integrated", "grid_export", 1),
+    ("battery_charge_energy_integrated", "battery_power_charge", 1),
+    ("battery_discharge_energy_integrated", "battery_power_charge", -1),
+    ("house_load_energy_integrated", "house_load", 1),
+)
+
+ENERGY_POWER_KEYS = {power_key for _, power_key, _ in ENERGY_SOURCES}
+
+
+class SolaXModbusEnergyIntegrator:
+    """Integrate power samples into energy totals with the trapezoidal rule.
+
+    Each power is integrated from its own previous sample, so samples that
+    carry only some of the powers, like burst samples, are used as well.
+    The totals are in kWh and kept in a Store across restarts.
+    """
+
+    def __init__(self, store, totals=None):
+        """Continue from totals, as saved by a previous run."""
+        self._store = store
+        self.totals = {energy_key: 0.0 for energy_key, _, _ in ENERGY_SOURCES}
+        self.totals.update(totals or {})
+        self._last = {}
+        self._save_pending = False
+
+    @classmethod
+    async def async_load(cls, hass, name):
+        """Return the integrator of hub name with its saved totals."""
+        store = Store(hass, STORAGE_VERSION, f"{DOMAIN}_energy_{name}")
+        return cls(store, await store.async_load())
+
+    def add(self, powers, now):
+        """Integrate the powers in W sampled at monotonic time now."""
+        last = self._last
+        for power_key in ENERGY_POWER_KEYS:
+            power = powers.get(power_key)
+            if power is None:
+                continue
+            previous = last.get(power_key)
+            last[power_key] = (now, power)
+            if previous is None or not 0 < now - previous[0] <= MAX_SAMPLE_GAP:
+                continue
+            hours = (now - previous[0]) / 3600
+            for energy_key, source_key, sign in ENERGY_SOURCES:
+                if source_key == power_key:
+                    mean = (max(sign * previous[1], 0) + max(sign * power, 0)) / 2
+                    self.totals[energy_key] += mean * hours / 1000
+        # async_delay_save restarts its timer on every call, and samples
+        # arrive faster than SAVE_DELAY, so only schedule when none is.
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self):
+        """Return the totals to save and allow the next delayed save."""
+        self._save_pending = False
+        return dict(self.totals)
+
+    def values(self):
+        """Return the totals rounded for publishing."""
+        return {
+            energy_key: round(total, 3) for energy_key, total in self.totals.items()
+        }
+
+    async def async_save(self):
+        """Save the totals now."""
+        self._save_pending = False
+        await self._store.async_save(dict(self.totals))
+
+
+ENERGY_SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
+    energy_key: SolaXModbusSensorEntityDescription(
+        name=name,
+        key=energy_key,
+        native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+        device_class=DEVICE_CLASS_ENERGY,
+        state_class=STATE_CLASS_TOTAL_INCREASING,
+    )
+    for energy_key, name in (
+        ("pv_energy_integrated", "Integrated PV Energy"),
+        ("grid_import_energy_integrated", "Integrated Grid Import Energy"),
+        ("grid_export_energy_integrated", "Integrated Grid Export Energy"),
+        ("battery_charge_energy_integrated", "Integrated Battery Charge Energy"),
+        ("battery_discharge_energy_integrated", "Integrated Battery Discharge Energy"),
+        ("house_load_energy_integrated", "Integrated House Load Energy"),
+    )
+}
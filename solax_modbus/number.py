@@ -95,10 +95,10 @@ class SolaXModbusNumber(NumberEntity):
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks."""
-        self._hub.async_add_solax_modbus_sensor(self._modbus_data_updated)
+        self._hub.async_add_solax_modbus_sensor(self._modbus_data_updated, self._key)
 
     async def async_will_remove_from_hass(self) -> None:
-        self._hub.async_remove_solax_modbus_sensor(self._modbus_data_updated)
+        self._hub.async_remove_solax_modbus_sensor(self._modbus_data_updated, self._key)
     
     async def async_set_value(self, value: float) -> None:
     	return self._hub.data[self._state]
@@ -122,6 +122,11 @@ class SolaXModbusNumber(NumberEntity):
 #        """Data is delivered by the hub"""
 #        return False
 
+    @property
+    def available(self) -> bool:
+        """Return True unless the inverter is offline."""
+        return self._hub.available
+
     @property
     def unique_id(self) -> Optional[str]:
         return f"{self._platform_name}_{self._key}"
@@ -141,10 +146,12 @@ class SolaXModbusNumber(NumberEntity):
         
         if self._fmt == "i":
             payload = int(value)
+            to_value = int
         elif self._fmt == "f":
             payload = int(value * mult)
+            to_value = lambda register: register / mult
 
-        self._hub.write_register(unit=1, address=self._register, payload=payload)
+        self._hub.async_queue_write(self._register, payload, self._key, to_value)
 
         self._hub.data[self._key] = value
         self.async_write_ha_state()
\ No newline at end of file
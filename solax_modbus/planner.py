@@ -0,0 +1,61 @@
+"""Plan the Modbus requests needed for a set of values."""
+from .const import (
+    DEFAULT_MAX_READ_GAP,
+    MAX_READ_COUNT,
+    REGISTER_BLOCKS,
+    REGISTER_MAPS,
+    SolaXModbusBlock,
+)
+from .decoder import register_length
+from .derived import DERIVED_KEYS
+
+
+def plan_blocks(keys, max_gap=DEFAULT_MAX_READ_GAP):
+    """Return the fewest blocks that read every register backing ``keys``.
+
+    Registers are only merged inside one of the documented REGISTER_BLOCKS,
+    so a planned block never spans two polling tiers or reads addresses the
+    inverter does not implement. Two registers share a request when the gap
+    between them is at most ``max_gap`` registers and the request stays
+    within the Modbus limit of MAX_READ_COUNT registers.
+    """
+    wanted_keys = set(keys)
+    for key in keys:
+        wanted_keys.update(DERIVED_KEYS.get(key, ()))
+
+    blocks = []
+    for region in REGISTER_BLOCKS:
+        region_end = region.address + region.count
+        wanted = sorted(
+            (
+                register
+                for register in REGISTER_MAPS[region.register_type]
+                if register.key in wanted_keys
+                and region.address <= register.address
+                and register.address + register_length(register) <= region_end
+            ),
+            key=lambda register: register.address,
+        )
+
+        start = end = None
+        for register in wanted:
+            register_end = register.address + register_length(register)
+            if (
+                start is not None
+                and register.address - end <= max_gap
+                and register_end - start <= MAX_READ_COUNT
+            ):
+                end = max(end, register_end)
+                continue
+            if start is not None:
+                blocks.append(
+                    SolaXModbusBlock(region.register_type, start, end - start, region.tier)
+                )
+            start, end = register.address, register_end
+
+        if start is not None:
+            blocks.append(
+                SolaXModbusBlock(region.register_type, start, end - start, region.tier)
+            )
+
+    return blocks
@@ -0,0 +1,108 @@
+"""Opt-in profiler of the poll cycles of a SolaX Modbus hub."""
+import cProfile
+import io
+import pstats
+import time
+
+PHASE_IO = "io"
+PHASE_DECODE = "decode"
+PHASE_DISPATCH = "dispatch"
+PHASES = (PHASE_IO, PHASE_DECODE, PHASE_DISPATCH)
+
+
+class SolaXModbusProfiler:
+    """Time the phases of the next poll cycles and profile the CPU bound ones.
+
+    The I/O phase is spent awaiting the connection, which runs its
+    requests in the executor, so it is only timed: profiling the event
+    loop while it waits would capture whatever else Home Assistant runs
+    in between. Decode and dispatch run on the loop without awaiting and
+    are profiled with cProfile as well.
+
+    Failed cycles do not count towards the cycles to profile and their
+    timings are dropped; a timed out read would dwarf the ones that
+    answered.
+    """
+
+    def __init__(self, cycles):
+        """Profile the next cycles poll cycles."""
+        self.cycles_left = cycles
+        self._cycles = 0
+        self._failed_cycles = 0
+        self._profile = cProfile.Profile()
+        self._timings = {phase: [] for phase in PHASES}
+        # Phase and duration of every phase of the running cycle.
+        self._cycle_timings = []
+        self._phase = None
+        self._phase_started = None
+
+    def start(self, phase):
+        """End the running phase and start phase."""
+        self.stop()
+        self._phase = phase
+        self._phase_started = time.perf_counter()
+        if phase != PHASE_IO:
+            self._profile.enable()
+
+    def stop(self):
+        """End the running phase, if any."""
+        if self._phase is None:
+            return
+        if self._phase != PHASE_IO:
+            self._profile.disable()
+        self._cycle_timings.append(
+            (self._phase, time.perf_counter() - self._phase_started)
+        )
+        self._phase = None
+
+    def end_cycle(self):
+        """Count a finished poll cycle; return True once all were profiled."""
+        self.stop()
+        for phase, duration in self._cycle_timings:
+            self._timings[phase].append(duration)
+        self._cycle_timings = []
+        self._cycles += 1
+        self.cycles_left -= 1
+        return self.cycles_left <= 0
+
+    def fail_cycle(self):
+        """Drop the timings of a failed poll cycle."""
+        self.stop()
+        self._cycle_timings = []
+        self._failed_cycles += 1
+
+    def summary(self):
+        """Return the per-phase timing summary as text."""
+        lines = [
+            f"{self._cycles} poll cycles, {self._failed_cycles} failed ones left out",
+            "",
+        ]
+        lines.append(
+            f"{'phase':<10}{'count':>7}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"
+        )
+        for phase, timings in self._timings.items():
+            if not timings:
+                lines.append(f"{phase:<10}{0:>7}")
+                continue
+            total = sum(timings) * 1000
+            lines.append(
+                f"{phase:<10}{len(timings):>7}{total:>12.3f}"
+                f"{total / len(timings):>10.3f}{max(timings) * 1000:>10.3f}"
+            )
+        return "\n".join(lines)
+
+    def write(self, path):
+        """Write the cProfile stats to path and the summary next to it.
+
+        Blocking; run it in the executor. Returns the path of the summary.
+        """
+        self._profile.dump_stats(path)
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(40)
+        summary_path = f"{path}.txt"
+        with open(summary_path, "w") as summary_file:
+            summary_file.write(self.summary())
+            summary_file.write("\n\n")
+            summary_file.write(stream.getvalue())
+        return summary_path
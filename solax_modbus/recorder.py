@@ -0,0 +1,222 @@
+"""Raw register recorder of a SolaX Modbus hub.
+
+Every block response is appended to a fixed-size ring file, most as the
+difference to the previous response of the same block:
+
+    header   magic, version, capacity, tail, head
+    record   kind, timestamp, function code, address, count, then
+             KEY:   count registers
+             DELTA: number of changes, then (index, register) per change
+
+A record that does not fit before the end of the ring is written at its
+start, after a WRAP byte. Writing evicts the oldest records it overwrites,
+so a delta can lose the frame it applies to; readers skip deltas until the
+next key frame of that block, and every block gets a key frame at least
+every KEYFRAME_INTERVAL records.
+"""
+from collections import deque
+from functools import lru_cache
+from struct import Struct
+import threading
+import time
+
+MAGIC = b"SXRC"
+VERSION = 1
+
+KIND_KEY = 0
+KIND_DELTA = 1
+KIND_WRAP = 0xFF
+
+KEYFRAME_INTERVAL = 64
+
+HEADER = Struct(">4sB3xIII")
+RECORD = Struct(">BdBHB")
+CHANGE = Struct(">BH")
+
+
+@lru_cache(maxsize=None)
+def _registers(count):
+    """Return the struct of count registers."""
+    return Struct(f">{count}H")
+
+
+def _frame_size(kind, count):
+    """Return the size of a record with count registers or changes."""
+    if kind == KIND_KEY:
+        return RECORD.size + 2 * count
+    return RECORD.size + 1 + CHANGE.size * count
+
+
+class SolaXModbusRecorder:
+    """Append raw block responses to a ring file.
+
+    record() encodes on the event loop and only queues the bytes; flush()
+    writes them and is blocking, so run it in the executor.
+    """
+
+    def __init__(self, path, capacity):
+        """Record to path, keeping at most capacity bytes of records."""
+        self._path = path
+        self._capacity = capacity
+        self._previous = {}
+        self._since_key = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        self._file = None
+        self._records = deque()
+        self._head = 0
+
+    def open(self):
+        """Open the ring file, continuing it if it has the same capacity.
+
+        Blocking; run it in the executor.
+        """
+        try:
+            self._file = open(self._path, "r+b")
+        except FileNotFoundError:
+            self._file = open(self._path, "w+b")
+
+        header = self._file.read(HEADER.size)
+        if len(header) == HEADER.size:
+            magic, version, capacity, tail, head = HEADER.unpack(header)
+            if (magic, version, capacity) == (MAGIC, VERSION, self._capacity):
+                self._records = deque(_scan(self._file, capacity, tail, head))
+                self._head = head
+                return
+
+        self._file.truncate(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, self._capacity, 0, 0))
+        self._file.truncate(HEADER.size + self._capacity)
+        self._file.flush()
+
+    def close(self):
+        """Write the queued records and close the file. Blocking."""
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def record(self, function_code, address, registers):
+        """Queue one block response."""
+        block = (function_code, address, len(registers))
+        previous = self._previous.get(block)
+        self._previous[block] = registers
+        since_key = self._since_key.get(block, KEYFRAME_INTERVAL)
+
+        if previous is not None and since_key < KEYFRAME_INTERVAL:
+            changes = [
+                (index, value)
+                for index, (value, old) in enumerate(zip(registers, previous))
+                if value != old
+            ]
+            if _frame_size(KIND_DELTA, len(changes)) < _frame_size(
+                KIND_KEY, len(registers)
+            ):
+                frame = bytearray(RECORD.pack(KIND_DELTA, time.time(), *block))
+                frame.append(len(changes))
+                for change in changes:
+                    frame += CHANGE.pack(*change)
+                self._since_key[block] = since_key + 1
+                self._pending.append(bytes(frame))
+                return
+
+        self._since_key[block] = 1
+        self._pending.append(
+            RECORD.pack(KIND_KEY, time.time(), *block)
+            + _registers(len(registers)).pack(*registers)
+        )
+
+    def flush(self):
+        """Write the queued records to the ring file. Blocking."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if self._file is None or not pending:
+                return
+            for frame in pending:
+                self._write(frame)
+            tail = self._records[0][0] if self._records else self._head
+            self._file.seek(0)
+            self._file.write(
+                HEADER.pack(MAGIC, VERSION, self._capacity, tail, self._head)
+            )
+            self._file.flush()
+
+    def _write(self, frame):
+        """Write one record at the head, evicting what it overwrites."""
+        size = len(frame)
+        start = self._head
+        if start + size > self._capacity:
+            # The record goes to the start of the ring; mark the rest unused.
+            self._evict(start, self._capacity)
+            self._evict(0, size)
+            if start < self._capacity:
+                self._file.seek(HEADER.size + start)
+                self._file.write(bytes((KIND_WRAP,)))
+            start = 0
+        else:
+            self._evict(start, start + size)
+
+        self._file.seek(HEADER.size + start)
+        self._file.write(frame)
+        self._records.append((start, size))
+        self._head = start + size
+
+    def _evict(self, start, end):
+        """Drop the oldest records overlapping start to end."""
+        records = self._records
+        while records and records[0][0] < end and start < records[0][0] + records[0][1]:
+            records.popleft()
+
+
+def _scan(file, capacity, tail, head):
+    """Yield the offset and size of every record from tail to head."""
+    position = tail
+    while position != head:
+        if position >= capacity:
+            position = 0
+            continue
+        file.seek(HEADER.size + position)
+        kind = file.read(1)[0]
+        if kind == KIND_WRAP:
+            position = 0
+            continue
+        file.seek(HEADER.size + position)
+        header = file.read(RECORD.size)
+        count = header[-1]
+        if kind == KIND_DELTA:
+            count = file.read(1)[0]
+        size = _frame_size(kind, count)
+        yield position, size
+        position += size
+
+
+def read_frames(path):
+    """Yield timestamp, function code, address and registers of every frame.
+
+    Frames are yielded oldest first; deltas whose key frame was overwritten
+    are skipped.
+    """
+    with open(path, "rb") as file:
+        magic, version, capacity, tail, head = HEADER.unpack(file.read(HEADER.size))
+        if (magic, version) != (MAGIC, VERSION):
+            raise ValueError(f"{path} is not a SolaX Modbus recording")
+
+        previous = {}
+        for position, size in list(_scan(file, capacity, tail, head)):
+            file.seek(HEADER.size + position)
+            data = file.read(size)
+            kind, timestamp, function_code, address, count = RECORD.unpack_from(data)
+            block = (function_code, address, count)
+            if kind == KIND_KEY:
+                registers = list(_registers(count).unpack_from(data, RECORD.size))
+            else:
+                if block not in previous:
+                    continue
+                registers = list(previous[block])
+                for offset in range(RECORD.size + 1, size, CHANGE.size):
+                    index, value = CHANGE.unpack_from(data, offset)
+                    registers[index] = value
+            previous[block] = registers
+            yield timestamp, function_code, address, registers
+
@@ -65,10 +65,10 @@ class SolaXModbusSelect(SelectEntity):
 
     async def async_added_to_hass(self):
         """Register callbacks."""
-        self._hub.async_add_solax_modbus_sensor(self._modbus_data_updated)
+        self._hub.async_add_solax_modbus_sensor(self._modbus_data_updated, self._key)
 
     async def async_will_remove_from_hass(self) -> None:
-        self._hub.async_remove_solax_modbus_sensor(self._modbus_data_updated)
+        self._hub.async_remove_solax_modbus_sensor(self._modbus_data_updated, self._key)
 
     @callback
     def _modbus_data_updated(self):
@@ -89,13 +89,23 @@ class SolaXModbusSelect(SelectEntity):
         """Data is delivered by the hub"""
         return False
 
+    @property
+    def available(self) -> bool:
+        """Return True unless the inverter is offline."""
+        return self._hub.available
+
     @property
     def unique_id(self) -> Optional[str]:
         return f"{self._platform_name}_{self._key}"
 
     async def async_select_option(self, option: str) -> None:
         """Change the select option."""
-        self._hub.write_register(unit=1, address=self._register, payload=get_payload(self._option_dict, option))
+        self._hub.async_queue_write(
+            self._register,
+            get_payload(self._option_dict, option),
+            self._key,
+            self._option_dict.get,
+        )
 
         self._hub.data[self._key] = option
         self.async_write_ha_state()
\ No newline at end of file
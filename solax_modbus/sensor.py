@@ -1,4 +1,4 @@
-from homeassistant.const import CONF_NAME
+from homeassistant.const import CONF_NAME, ENTITY_CATEGORY_DIAGNOSTIC
 from homeassistant.core import callback
 from homeassistant.components.sensor import SensorEntity
 import logging
@@ -7,7 +7,10 @@ from typing import Optional, Dict, Any
 
 import homeassistant.util.dt as dt_util
 
-from .const import ATTR_MANUFACTURER, DOMAIN, SENSOR_TYPES, GEN3_X1_SENSOR_TYPES, GEN3_X3_SENSOR_TYPES, X1_EPS_SENSOR_TYPES, X3_EPS_SENSOR_TYPES, SolaXModbusSensorEntityDescription
+from .const import ATTR_MANUFACTURER, DOMAIN, SENSOR_TYPES, DIAGNOSTIC_SENSOR_TYPES, GEN3_X1_SENSOR_TYPES, GEN3_X3_SENSOR_TYPES, X1_EPS_SENSOR_TYPES, X3_EPS_SENSOR_TYPES, SolaXModbusSensorEntityDescription
+from .burst import burst_sensor_types
+from .energy import ENERGY_SENSOR_TYPES
+from .stats import STATS_SENSOR_TYPES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +35,34 @@ async def async_setup_entry(hass, entry, async_add_entities):
         )
         entities.append(sensor)
 
+    for sensor_description in [*DIAGNOSTIC_SENSOR_TYPES.values(), *STATS_SENSOR_TYPES.values()]:
+        sensor = SolaXModbusSensor(
+            hub_name,
+            hub,
+            device_info,
+            sensor_description,
+        )
+        entities.append(sensor)
+
+    for sensor_description in burst_sensor_types(hub.burst_keys).values():
+        sensor = SolaXModbusSensor(
+            hub_name,
+            hub,
+            device_info,
+            sensor_description,
+        )
+        entities.append(sensor)
+
+    if hub.integrates_energy:
+        for sensor_description in ENERGY_SENSOR_TYPES.values():
+            sensor = SolaXModbusSensor(
+                hub_name,
+                hub,
+                device_info,
+                sensor_description,
+            )
+            entities.append(sensor)
+
     if hub.read_gen3x1 == True:
         for sensor_description in GEN3_X1_SENSOR_TYPES.values():
             sensor = SolaXModbusSensor(
@@ -94,10 +125,10 @@ class SolaXModbusSensor(SensorEntity):
 
     async def async_added_to_hass(self):
         """Register callbacks."""
-        self._hub.async_add_solax_modbus_sensor(self._modbus_data_updated)
+        self._hub.async_add_solax_modbus_sensor(self._modbus_data_updated, self.entity_description.key)
 
     async def async_will_remove_from_hass(self) -> None:
-        self._hub.async_remove_solax_modbus_sensor(self._modbus_data_updated)
+        self._hub.async_remove_solax_modbus_sensor(self._modbus_data_updated, self.entity_description.key)
 
     @callback
     def _modbus_data_updated(self):
@@ -117,6 +148,19 @@ class SolaXModbusSensor(SensorEntity):
     def unique_id(self) -> Optional[str]:
         return f"{self._platform_name}_{self.entity_description.key}"  
     
+    @property
+    def available(self):
+        """Return True unless the inverter is offline; diagnostics stay available."""
+        return (
+            self._hub.available
+            or self.entity_description.entity_category == ENTITY_CATEGORY_DIAGNOSTIC
+        )
+
+    @property
+    def extra_state_attributes(self):
+        """Return the attributes the hub keeps for this value."""
+        return self._hub.data_attributes.get(self.entity_description.key)
+
     @property
     def native_value(self):
         """Return the state of the sensor."""
@@ -0,0 +1,147 @@
+"""Request statistics of the SolaX Modbus hub, published as diagnostic sensors."""
+from homeassistant.components.sensor import (
+    STATE_CLASS_MEASUREMENT,
+    STATE_CLASS_TOTAL_INCREASING,
+)
+from homeassistant.const import DATA_BYTES, ENTITY_CATEGORY_DIAGNOSTIC, TIME_MILLISECONDS
+from pymodbus.exceptions import ModbusIOException
+
+from .const import REGISTER_BLOCKS, SolaXModbusSensorEntityDescription
+
+# Upper bounds of the latency histogram buckets in seconds; the last bucket
+# counts everything slower.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+# Weight of the newest request in the published latency, which follows
+# roughly the last 10 requests.
+LATENCY_SMOOTHING = 0.2
+
+
+def region_key(block):
+    """Return the stats key of the REGISTER_BLOCKS region holding block."""
+    for region in REGISTER_BLOCKS:
+        if (
+            region.register_type == block.register_type
+            and region.address <= block.address < region.address + region.count
+        ):
+            return f"block_{region.register_type}_{region.address:x}"
+    raise ValueError(f"{block} is outside the register regions")
+
+
+class SolaXModbusRequestStats:
+    """Counters of the requests that read one register region."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self.requests = 0
+        self.timeouts = 0
+        self.exceptions = 0
+        self.latency_total = 0.0
+        self.last_latency = None
+        self.recent_latency = None
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, latency, response):
+        """Count one request; response is None if it raised."""
+        self.requests += 1
+        self.latency_total += latency
+        self.last_latency = latency
+        if self.recent_latency is None:
+            self.recent_latency = latency
+        else:
+            self.recent_latency += LATENCY_SMOOTHING * (latency - self.recent_latency)
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and latency > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        self.histogram[bucket] += 1
+
+        if isinstance(response, ModbusIOException):
+            self.timeouts += 1
+        elif response is None or response.isError():
+            self.exceptions += 1
+
+    @property
+    def errors(self):
+        """Return the number of failed requests."""
+        return self.timeouts + self.exceptions
+
+    @property
+    def latency(self):
+        """Return the smoothed latency of the recent requests in milliseconds."""
+        if self.recent_latency is None:
+            return None
+        return round(self.recent_latency * 1000, 1)
+
+    @property
+    def attributes(self):
+        """Return the counters as state attributes."""
+        buckets = [f"<= {bound * 1000:g} ms" for bound in LATENCY_BUCKETS]
+        buckets.append(f"> {LATENCY_BUCKETS[-1] * 1000:g} ms")
+        return {
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "exceptions": self.exceptions,
+            "last_latency_ms": None
+            if self.last_latency is None
+            else round(self.last_latency * 1000, 1),
+            "mean_latency_ms": round(self.latency_total / self.requests * 1000, 1)
+            if self.requests
+            else None,
+            "histogram": dict(zip(buckets, self.histogram)),
+        }
+
+
+def _stats_sensor(key, name, **kwargs):
+    return SolaXModbusSensorEntityDescription(
+        key=key,
+        name=name,
+        entity_category=ENTITY_CATEGORY_DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        **kwargs,
+    )
+
+
+STATS_SENSOR_TYPES: dict[str, list[SolaXModbusSensorEntityDescription]] = {
+    "cycle_duration": _stats_sensor(
+        "cycle_duration",
+        "Cycle Duration",
+        native_unit_of_measurement=TIME_MILLISECONDS,
+        state_class=STATE_CLASS_MEASUREMENT,
+        icon="mdi:timer-sand",
+    ),
+    "overrun_cycles": _stats_sensor(
+        "overrun_cycles",
+        "Overrun Cycles",
+        state_class=STATE_CLASS_TOTAL_INCREASING,
+        icon="mdi:timer-alert-outline",
+    ),
+    "failed_cycles": _stats_sensor(
+        "failed_cycles",
+        "Failed Cycles",
+        state_class=STATE_CLASS_TOTAL_INCREASING,
+        icon="mdi:alert-circle-outline",
+    ),
+    "bytes_transferred": _stats_sensor(
+        "bytes_transferred",
+        "Bytes Transferred",
+        native_unit_of_measurement=DATA_BYTES,
+        state_class=STATE_CLASS_TOTAL_INCREASING,
+        icon="mdi:swap-horizontal",
+    ),
+}
+
+for _region in REGISTER_BLOCKS:
+    _key = region_key(_region)
+    _name = f"Block {_region.register_type.capitalize()} {_region.address:#x}"
+    STATS_SENSOR_TYPES[f"{_key}_latency"] = _stats_sensor(
+        f"{_key}_latency",
+        f"{_name} Latency",
+        native_unit_of_measurement=TIME_MILLISECONDS,
+        state_class=STATE_CLASS_MEASUREMENT,
+        icon="mdi:timer-outline",
+    )
+    STATS_SENSOR_TYPES[f"{_key}_errors"] = _stats_sensor(
+        f"{_key}_errors",
+        f"{_name} Errors",
+        state_class=STATE_CLASS_TOTAL_INCREASING,
+        icon="mdi:alert-circle-outline",
+    )